@@ -0,0 +1,64 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from render import ListType, INTEGER, RATIONAL
+from output import OutputSink
+from main import ENGINES
+
+SOURCE = '''create list<integer> variable valores;
+create integer variable i to 0;
+while i < {n} do
+    add(valores, i);
+    set i to i + 1;
+end
+create integer variable soma to 0;
+for valor in valores do set soma to soma + valor; end
+writeln soma;
+'''
+
+ELEMENTS = {'integer': (INTEGER, lambda i: i * 7), 'rational': (RATIONAL, lambda i: i * 0.5)}
+
+def storage_size(interpreter, element_type, make, size):
+    gc.collect()
+    tracemalloc.start()
+    values = interpreter._initial_value(ListType(element_type))
+    for i in range(size): values.append(make(i))
+    size_in_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del values
+    return size_in_bytes
+
+def run(interpreter_class, source, compact_lists):
+    interpreter = interpreter_class()
+    interpreter.compact_lists = compact_lists
+    with open(os.devnull, 'w') as devnull:
+        interpreter.output = OutputSink(devnull)
+        start = time.perf_counter()
+        interpreter.run_source(source)
+        return time.perf_counter() - start
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    print(f"memória de uma lista com {size:,} elementos")
+    print(f"{'tipo':<10} {'list (MB)':>10} {'compacta (MB)':>14} {'bytes/elemento':>15} {'redução':>8}")
+    for name, (element_type, make) in ELEMENTS.items():
+        interpreter = ENGINES['tree']()
+        interpreter.compact_lists = False
+        boxed = storage_size(interpreter, element_type, make, size)
+        interpreter.compact_lists = True
+        compact = storage_size(interpreter, element_type, make, size)
+        print(f"{name:<10} {boxed / 1e6:>10.1f} {compact / 1e6:>14.1f} {f'{boxed / size:.1f} -> {compact / size:.1f}':>15} {boxed / compact:>7.1f}x")
+    print(f"\ntempo de add + for com {iterations:,} elementos")
+    print(f"{'motor':<9} {'list (s)':>9} {'compacta (s)':>13}")
+    source = SOURCE.format(n=iterations)
+    for engine, interpreter_class in ENGINES.items():
+        print(f"{engine:<9} {run(interpreter_class, source, False):>9.3f} {run(interpreter_class, source, True):>13.3f}")
+
+if __name__ == "__main__":
+    main()
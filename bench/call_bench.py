@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from prose_ast import RuntimeException
+from render import Frame
+from interpreter import Interpreter, ProseFunction, ReturnSignal, type_of
+from closure_compiler import ClosureCompiler, CompiledInterpreter, error_token
+
+SOURCE = '''function fatorial(integer n) -> integer
+    if n <= 1 then
+        return 1;
+    end
+    return n * fatorial(n - 1);
+end
+function soma(integer a, integer b) -> integer
+    return a + b;
+end
+create integer variable i to 0;
+create integer variable total to 0;
+while i < {n} do
+    set total to soma(total, fatorial(10) % 7);
+    set i to i + 1;
+end
+'''
+CALLS_PER_ITERATION = 11
+
+class ExceptionReturnInterpreter(Interpreter):
+    def visit_ReturnStatement(self, node):
+        raise ReturnSignal(super().visit_ReturnStatement(node))
+
+    def visit_FunctionCall(self, node):
+        try: return super().visit_FunctionCall(node)
+        except ReturnSignal as rs: return rs.value_wrapper.value
+
+class ExceptionReturnCompiler(ClosureCompiler):
+    def compile_ReturnStatement(self, node):
+        value = super().compile_ReturnStatement(node)
+        def return_statement(env): raise ReturnSignal(value(env))
+        return return_statement
+
+    def compile_FunctionCall(self, node):
+        if node.native: return super().compile_FunctionCall(node)
+        arguments = [self.compile(argument) for argument in node.arguments]
+        callee, callee_token = self.compile(node.callee), error_token(node.callee)
+        def function_call(env):
+            func_obj = callee(env)
+            if not isinstance(func_obj, ProseFunction):
+                raise RuntimeException(f"Expressão do tipo '{type_of(func_obj, node.callee.static_type)}' não é chamável.", callee_token)
+            arg_values = [argument(env) for argument in arguments]
+            scope = func_obj.declaration.scope
+            func_env = func_obj.closure if scope.elided else Frame(scope, func_obj.closure)
+            for i, (symbol, redeclaration) in enumerate(func_obj.parameters):
+                func_env.declare(symbol, redeclaration, arg_values[i])
+            try:
+                func_obj.body(func_env)
+            except ReturnSignal as rs:
+                return rs.value_wrapper.value
+        return function_call
+
+class ExceptionReturnCompiledInterpreter(CompiledInterpreter):
+    def __init__(self):
+        super().__init__()
+        self.compiler = ExceptionReturnCompiler(self)
+
+ENGINES = {
+    'tree': (ExceptionReturnInterpreter, Interpreter),
+    'compiled': (ExceptionReturnCompiledInterpreter, CompiledInterpreter),
+}
+
+def measure(interpreter_class, source):
+    interpreter = interpreter_class()
+    start = time.perf_counter()
+    interpreter.run_source(source)
+    return interpreter.environment.get('total').value, time.perf_counter() - start
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    source, calls = SOURCE.format(n=iterations), iterations * CALLS_PER_ITERATION
+    print(f"chamadas por execução: {calls:,}")
+    print(f"{'motor':<9} {'antes (chamadas/s)':>19} {'depois (chamadas/s)':>20} {'ganho':>7}")
+    for engine, (legacy_class, current_class) in ENGINES.items():
+        legacy_total, legacy_time = measure(legacy_class, source)
+        total, current_time = measure(current_class, source)
+        if legacy_total != total: raise SystemExit(f"Resultados divergentes no motor '{engine}'")
+        print(f"{engine:<9} {calls / legacy_time:>19,.0f} {calls / current_time:>20,.0f} {legacy_time / current_time:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
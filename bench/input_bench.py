@@ -0,0 +1,61 @@
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from input_source import InputSource
+from output import OutputSink
+from main import ENGINES
+
+LOOP_SOURCE = '''create integer variable total to 0;
+create string variable linha;
+while end_of_input() == false do
+    read linha;
+    set total to total + 1;
+end
+writeln total;
+'''
+
+BULK_SOURCE = '''create list<string> variable linhas to read_lines();
+writeln length(linhas);
+'''
+
+def legacy_read_line(interpreter, token, prompt=''):
+    interpreter.output.flush()
+    return input(prompt)
+
+def measure(interpreter_class, source, data, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        interpreter = interpreter_class()
+        interpreter.output = OutputSink(io.StringIO())
+        interpreter.input = InputSource(io.StringIO(data))
+        stdin = sys.stdin
+        sys.stdin = io.StringIO(data)
+        try:
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                start = time.perf_counter()
+                interpreter.run_source(source)
+                timings.append(time.perf_counter() - start)
+        finally:
+            sys.stdin = stdin
+    return min(timings)
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    data = ''.join(f"linha {i}\n" for i in range(lines))
+    legacy_source = LOOP_SOURCE.replace('end_of_input() == false', f'total < {lines}')
+    print(f"linhas de entrada: {lines:,}")
+    print(f"{'motor':<9} {'input() (linhas/s)':>19} {'read (linhas/s)':>16} {'read_lines (linhas/s)':>22}")
+    for engine, interpreter_class in ENGINES.items():
+        legacy_class = type(f"Legacy{interpreter_class.__name__}", (interpreter_class,), {'_read_line': legacy_read_line})
+        legacy_time = measure(legacy_class, legacy_source, data)
+        loop_time = measure(interpreter_class, LOOP_SOURCE, data)
+        bulk_time = measure(interpreter_class, BULK_SOURCE, data)
+        print(f"{engine:<9} {lines / legacy_time:>19,.0f} {lines / loop_time:>16,.0f} {lines / bulk_time:>22,.0f}")
+
+if __name__ == "__main__":
+    main()
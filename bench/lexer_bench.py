@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from util.token import Token, TokenType
+from lexer import Lexer, token_regex
+
+SAMPLE = '''# bloco gerado para benchmark
+create integer variable contador{n} to {n};
+create rational variable taxa{n} to 3.14159;
+create list<string> variable nomes{n} to ["Ana", "Beto", "Caio"];
+function dobro{n}(integer valor) -> integer
+    return valor * 2 + contador{n} % 7;
+end
+if contador{n} >= 10 && taxa{n} != 0.5 then
+    writeln "Contador: " + dobro{n}(contador{n});
+elif contador{n} <= 3 || true then
+    set contador{n} to contador{n} - 1;
+else
+    write "nada";
+end
+'''
+
+def legacy_tokenize(text):
+    pos, line, column, tokens = 0, 1, 1, []
+    while pos < len(text):
+        if text[pos] == '\n':
+            line += 1; column = 1; pos += 1
+            continue
+        for token_type, regex in token_regex.items():
+            match = regex.match(text, pos)
+            if match:
+                lexeme = match.group(0)
+                if token_type != TokenType.SKIP: tokens.append(Token(token_type, lexeme, line, column))
+                pos += len(lexeme); column += len(lexeme)
+                break
+        else:
+            raise Exception(f"Caractere inválido na linha {line}, coluna {column}: {text[pos]}")
+    tokens.append(Token(TokenType.EOF, "", line, column))
+    return tokens
+
+def build_source(lines):
+    block_lines = SAMPLE.count('\n')
+    return ''.join(SAMPLE.format(n=n) for n in range(lines // block_lines + 1))
+
+def measure(tokenize, source, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = tokenize(source)
+        best = min(best, time.perf_counter() - start)
+    return tokens, best
+
+def same_stream(expected, actual):
+    return len(expected) == len(actual) and all(
+        (a.token_type, a.value, a.line, a.column) == (b.token_type, b.value, b.line, b.column) for a, b in zip(expected, actual))
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 100_000]
+    print(f"{'linhas':>8} {'tokens':>9} {'antes (tok/s)':>14} {'depois (tok/s)':>15} {'ganho':>7}")
+    for lines in sizes:
+        source = build_source(lines)
+        legacy_tokens, legacy_time = measure(legacy_tokenize, source, 1)
+        tokens, new_time = measure(Lexer().tokenize, source, 3)
+        if not same_stream(legacy_tokens, tokens): raise SystemExit(f"Fluxo de tokens divergente para {lines} linhas")
+        print(f"{lines:>8} {len(tokens):>9} {len(tokens) / legacy_time:>14,.0f} {len(tokens) / new_time:>15,.0f} {legacy_time / new_time:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from output import OutputSink
+from main import ENGINES
+
+SETUP = '''create list<integer> variable valores;
+create integer variable semente to 12345;
+create integer variable i to 0;
+while i < {n} do
+    set semente to (semente * 1103515245 + 12345) % 2147483648;
+    add(valores, semente % 1000000);
+    set i to i + 1;
+end
+'''
+
+LOOPS = {
+    'sum': ('''create integer variable total to 0;
+for valor in valores do set total to total + valor; end
+writeln total;
+''', 'writeln sum(valores);\n'),
+    'max': ('''create integer variable maior to get(valores, 0);
+for valor in valores do
+    if valor > maior then set maior to valor; end
+end
+writeln maior;
+''', 'writeln max(valores);\n'),
+    'contains': ('''create boolean variable achou to false;
+for valor in valores do
+    if valor == 1000001 then set achou to true; end
+end
+writeln achou;
+''', 'writeln contains(valores, 1000001);\n'),
+}
+
+INSERTION_SORT = '''create integer variable j to 1;
+create integer variable k to 0;
+create integer variable atual to 0;
+create boolean variable deslocando to false;
+while j < length(valores) do
+    set atual to valores[j];
+    set k to j - 1;
+    set deslocando to k >= 0;
+    do
+        if deslocando then
+            if valores[k] > atual then
+                set valores[k + 1] to valores[k];
+                set k to k - 1;
+                set deslocando to k >= 0;
+            else
+                set deslocando to false;
+            end
+        end
+    while deslocando end
+    set valores[k + 1] to atual;
+    set j to j + 1;
+end
+'''
+
+NATIVE_SORT = 'sort(valores);\n'
+
+def measure(interpreter_class, setup, source):
+    interpreter = interpreter_class()
+    with open(os.devnull, 'w') as devnull:
+        interpreter.output = OutputSink(devnull)
+        interpreter.run_source(setup)
+        start = time.perf_counter()
+        interpreter.run_source(source)
+        return time.perf_counter() - start
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sort_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    setup, sort_setup = SETUP.format(n=size), SETUP.format(n=sort_size)
+    print(f"{'motor':<9} {'operação':<24} {'laço Prose (s)':>15} {'nativa (s)':>11} {'ganho':>9}")
+    for engine, interpreter_class in ENGINES.items():
+        for name, (loop, native) in LOOPS.items():
+            loop_time, native_time = measure(interpreter_class, setup, loop), measure(interpreter_class, setup, native)
+            print(f"{engine:<9} {f'{name} ({size:,})':<24} {loop_time:>15.3f} {native_time:>11.4f} {loop_time / native_time:>8.0f}x")
+        loop_time, native_time = measure(interpreter_class, sort_setup, INSERTION_SORT), measure(interpreter_class, sort_setup, NATIVE_SORT)
+        print(f"{engine:<9} {f'sort ({sort_size:,})':<24} {loop_time:>15.3f} {native_time:>11.4f} {loop_time / native_time:>8.0f}x")
+        print(f"{engine:<9} {f'sort ({size:,})':<24} {'-':>15} {measure(interpreter_class, setup, NATIVE_SORT):>11.4f}")
+
+if __name__ == "__main__":
+    main()
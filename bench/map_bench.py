@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from output import OutputSink
+from main import ENGINES
+
+LIST_SETUP = '''create type Registro (string chave, integer valor);
+create list<Registro> variable registros;
+create integer variable i to 0;
+while i < {n} do
+    create Registro variable registro;
+    set registro.chave to "chave" + i;
+    set registro.valor to i;
+    add(registros, registro);
+    set i to i + 1;
+end
+function buscar(list<Registro> registros, string chave) -> integer
+    for registro in registros do
+        if registro.chave == chave then return registro.valor; end
+    end
+    return 0 - 1;
+end
+'''
+
+MAP_SETUP = '''create map<string, integer> variable indice;
+create integer variable i to 0;
+while i < {n} do
+    put(indice, "chave" + i, i);
+    set i to i + 1;
+end
+'''
+
+LOOKUPS = '''create integer variable total to 0;
+create integer variable j to 0;
+while j < {lookups} do
+    set total to total + {lookup};
+    set j to j + 1;
+end
+writeln total;
+'''
+
+def measure(interpreter_class, setup, source):
+    interpreter = interpreter_class()
+    with open(os.devnull, 'w') as devnull:
+        interpreter.output = OutputSink(devnull)
+        interpreter.run_source(setup)
+        start = time.perf_counter()
+        interpreter.run_source(source)
+        return time.perf_counter() - start
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    scan_lookups, map_lookups = 100, 100_000
+    print(f"{'motor':<9} {'chaves':>8} {'varredura (µs/busca)':>21} {'map (µs/busca)':>15} {'ganho':>9}")
+    for engine, interpreter_class in ENGINES.items():
+        for size in sizes:
+            key = f'"chave" + (j * 7919) % {size}'
+            scan = measure(interpreter_class, LIST_SETUP.format(n=size), LOOKUPS.format(lookups=scan_lookups, lookup=f'buscar(registros, {key})')) / scan_lookups
+            lookup = measure(interpreter_class, MAP_SETUP.format(n=size), LOOKUPS.format(lookups=map_lookups, lookup=f'get(indice, {key})')) / map_lookups
+            print(f"{engine:<9} {size:>8,} {scan * 1e6:>21,.1f} {lookup * 1e6:>15,.2f} {scan / lookup:>8,.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from output import OutputSink
+from interpreter import StructInstance, type_of
+from main import ENGINES
+
+SOURCE = '''create integer variable i to 0;
+while i < {n} do
+    writeln i;
+    set i to i + 1;
+end
+'''
+
+DESTINATIONS = {'arquivo': -1, 'terminal': 1}
+
+def legacy_write(interpreter, value, static_type, end):
+    if isinstance(value, StructInstance): print(f"<Objeto {type_of(value, static_type).name}>", end=end)
+    else: print(value, end=end)
+
+def measure(interpreter_class, source, buffering, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        interpreter = interpreter_class()
+        with open(os.devnull, 'w', buffering=buffering) as devnull, redirect_stdout(devnull):
+            interpreter.output = OutputSink(devnull)
+            start = time.perf_counter()
+            interpreter.run_source(source)
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    source = SOURCE.format(n=lines)
+    print(f"linhas por execução: {lines:,}")
+    print(f"{'motor':<9} {'destino':<9} {'antes (linhas/s)':>17} {'depois (linhas/s)':>18} {'ganho':>7}")
+    for engine, interpreter_class in ENGINES.items():
+        legacy_class = type(f"Legacy{interpreter_class.__name__}", (interpreter_class,), {'_write': legacy_write})
+        for destination, buffering in DESTINATIONS.items():
+            legacy_time = measure(legacy_class, source, buffering)
+            current_time = measure(interpreter_class, source, buffering)
+            print(f"{engine:<9} {destination:<9} {lines / legacy_time:>17,.0f} {lines / current_time:>18,.0f} {legacy_time / current_time:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from output import OutputSink
+from main import ENGINES
+
+VARIANTS = {
+    'while': '''create integer variable total to 0;
+create integer variable i to 0;
+while i < {n} do
+    set total to total + i;
+    set i to i + 1;
+end
+writeln total;
+''',
+    'lista + for': '''create list<integer> variable indices;
+create integer variable i to 0;
+while i < {n} do
+    add(indices, i);
+    set i to i + 1;
+end
+create integer variable total to 0;
+for j in indices do set total to total + j; end
+writeln total;
+''',
+    'for range': '''create integer variable total to 0;
+for i in range(0, {n}) do set total to total + i; end
+writeln total;
+''',
+}
+
+def run(interpreter_class, source, trace=False):
+    interpreter = interpreter_class()
+    with open(os.devnull, 'w') as devnull:
+        interpreter.output = OutputSink(devnull)
+        if trace: tracemalloc.start()
+        start = time.perf_counter()
+        interpreter.run_source(source)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else 0
+        if trace: tracemalloc.stop()
+        return elapsed, peak
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    large = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000_000
+    print(f"tempo com {iterations:,} iterações (s)")
+    print(f"{'motor':<9}" + ''.join(f"{name:>13}" for name in VARIANTS))
+    for engine, interpreter_class in ENGINES.items():
+        print(f"{engine:<9}" + ''.join(f"{run(interpreter_class, source.format(n=iterations))[0]:>13.3f}" for source in VARIANTS.values()))
+    print(f"\npico de memória com {iterations:,} iterações (motor compiled, MB)")
+    for name, source in VARIANTS.items():
+        print(f"{name:<12} {run(ENGINES['compiled'], source.format(n=iterations), trace=True)[1] / 1e6:>8.2f}")
+    elapsed, peak = run(ENGINES['compiled'], VARIANTS['for range'].format(n=large), trace=True)
+    print(f"for range com {large:,} iterações: {elapsed:.1f} s, pico de {peak / 1e6:.2f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from render import Frame
+from main import ENGINES
+
+PROGRAMS = {
+    'sem declarações': '''create integer variable i to 0;
+create integer variable total to 0;
+while i < {n} do
+    set total to total + i % 3;
+    set i to i + 1;
+end
+''',
+    'com declaração': '''create integer variable i to 0;
+create integer variable total to 0;
+while i < {n} do
+    create integer variable resto to i % 3;
+    set total to total + resto;
+    set i to i + 1;
+end
+''',
+}
+
+def count_frames(action):
+    original, count = Frame.__init__, [0]
+    def counting_init(frame, scope, enclosing):
+        count[0] += 1
+        original(frame, scope, enclosing)
+    Frame.__init__ = counting_init
+    try: action()
+    finally: Frame.__init__ = original
+    return count[0]
+
+def run(engine, source, elide_scopes):
+    interpreter = ENGINES[engine]()
+    interpreter.elide_scopes = elide_scopes
+    interpreter.run_source(source)
+    return interpreter.environment.get('total').value
+
+def main():
+    engine, args = 'compiled', []
+    for arg in sys.argv[1:]:
+        if arg.startswith('--engine='): engine = arg.split('=', 1)[1]
+        else: args.append(int(arg))
+    iterations = args[0] if args else 1_000_000
+    print(f"motor: {engine}, iterações: {iterations:,}")
+    print(f"{'programa':<16} {'modo':<7} {'frames':>10} {'tempo (s)':>10}")
+    for name, template in PROGRAMS.items():
+        source, totals = template.format(n=iterations), set()
+        for mode, elide_scopes in (('antes', False), ('depois', True)):
+            frames = count_frames(lambda: totals.add(run(engine, source, elide_scopes)))
+            start = time.perf_counter()
+            totals.add(run(engine, source, elide_scopes))
+            elapsed = time.perf_counter() - start
+            print(f"{name:<16} {mode:<7} {frames:>10,} {elapsed:>10.2f}")
+        if len(totals) != 1: raise SystemExit(f"Resultados divergentes para '{name}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from output import OutputSink
+from main import ENGINES
+
+CONCAT_SOURCE = '''create string variable relatorio to "";
+create integer variable i to 0;
+while i < {n} do
+    set relatorio to relatorio + "linha do relatório número " + i + "\\n";
+    set i to i + 1;
+end
+writeln length(relatorio);
+'''
+
+BUILDER_SOURCE = '''create builder variable relatorio;
+create integer variable i to 0;
+while i < {n} do
+    append(relatorio, "linha do relatório número " + i + "\\n");
+    set i to i + 1;
+end
+writeln length(to_string(relatorio));
+'''
+
+def run(interpreter_class, source):
+    interpreter = interpreter_class()
+    with open(os.devnull, 'w') as devnull:
+        interpreter.output = OutputSink(devnull)
+        interpreter.run_source(source)
+
+def measure(interpreter_class, source):
+    start = time.perf_counter()
+    run(interpreter_class, source)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    run(interpreter_class, source)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 20_000, 40_000]
+    print(f"{'motor':<9} {'linhas':>8} {'MB':>6} {'s + x (s)':>10} {'builder (s)':>12} {'pico s + x (MB)':>16} {'pico builder (MB)':>18}")
+    for engine, interpreter_class in ENGINES.items():
+        for lines in sizes:
+            megabytes = sum(len(f"linha do relatório número {i}\n") for i in range(lines)) / 1e6
+            concat_time, concat_peak = measure(interpreter_class, CONCAT_SOURCE.format(n=lines))
+            builder_time, builder_peak = measure(interpreter_class, BUILDER_SOURCE.format(n=lines))
+            print(f"{engine:<9} {lines:>8,} {megabytes:>6.1f} {concat_time:>10.3f} {builder_time:>12.3f} {concat_peak / 1e6:>16.1f} {builder_peak / 1e6:>18.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from render import StructType, INTEGER, STRING, RATIONAL
+from output import OutputSink
+from main import ENGINES
+
+PESSOA = StructType('Pessoa', {'nome': STRING, 'idade': INTEGER, 'altura': RATIONAL})
+
+SOURCE = '''create type Pessoa (
+    string nome,
+    integer idade,
+    rational altura
+);
+create list<Pessoa> variable pessoas;
+create integer variable i to 0;
+while i < {n} do
+    create Pessoa variable p;
+    set p.nome to "Ana";
+    set p.idade to i;
+    set p.altura to 1.5;
+    add(pessoas, p);
+    set i to i + 1;
+end
+create integer variable soma to 0;
+for pessoa in pessoas do set soma to soma + pessoa.idade; end
+writeln soma;
+'''
+
+class LegacyStructInstance:
+    __slots__ = ('struct_type', '__dict__')
+    def __init__(self, struct_type): self.struct_type = struct_type
+
+def legacy_record(interpreter, struct_type):
+    value = LegacyStructInstance(struct_type)
+    for field_name, field_type in struct_type.fields.items(): setattr(value, field_name, interpreter._field_default(field_type))
+    return value
+
+def records_size(make, size):
+    gc.collect()
+    tracemalloc.start()
+    records = [make() for _ in range(size)]
+    size_in_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return size_in_bytes
+
+def run(interpreter_class, source, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        interpreter = interpreter_class()
+        with open(os.devnull, 'w') as devnull:
+            interpreter.output = OutputSink(devnull)
+            start = time.perf_counter()
+            interpreter.run_source(source)
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    interpreter = ENGINES['tree']()
+    legacy = records_size(lambda: legacy_record(interpreter, PESSOA), records)
+    current = records_size(lambda: interpreter._initial_value(PESSOA), records)
+    print(f"memória de {records:,} registros Pessoa (MB)")
+    print(f"{'antes':>10} {'depois':>10} {'redução':>9}")
+    print(f"{legacy / 1e6:>10.1f} {current / 1e6:>10.1f} {legacy / current:>8.2f}x")
+    print(f"\ntempo com {iterations:,} registros (s)")
+    for engine, interpreter_class in ENGINES.items(): print(f"{engine:<9} {run(interpreter_class, SOURCE.format(n=iterations)):>8.3f}")
+
+if __name__ == "__main__":
+    main()
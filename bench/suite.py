@@ -0,0 +1,118 @@
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from lexer import Lexer
+from parsa import Parser
+from output import OutputSink
+from render import VariableBank
+from main import ENGINES
+
+PROGRAMS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'programs')
+PROGRAMS = ('fib', 'sieve', 'strings', 'structs', 'closures', 'modules')
+STAGES = ('lex', 'parse', 'run')
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10
+MIN_STAGE_TIME = 0.01
+USAGE = f"""Uso:
+  python bench/suite.py run [opções] [programa...]
+  python bench/suite.py compare <antes.json> <depois.json> [--threshold=<fração>]
+
+Opções de run:
+  --engine=<motor,...>     motores medidos (padrão: {','.join(ENGINES)})
+  --repeat=<n>             amostras por programa, motor e etapa (padrão: {DEFAULT_REPEAT})
+  --output=<arquivo.json>  grava os resultados em JSON
+
+Programas: {', '.join(PROGRAMS)}
+Etapas: lex = Lexer.tokenize; parse = Parser.parse (ambas repetidas até somar {MIN_STAGE_TIME * 1000:.0f} ms, tempo por chamada);
+run = otimização e Interpreter.run, incluindo a carga dos módulos importados (no motor vm, também a compilação para bytecode).
+compare marca como regressão toda etapa cujo menor tempo piorou mais que o limite (padrão: {DEFAULT_THRESHOLD:.0%})."""
+
+def per_call(function) -> tuple[object, float]:
+    calls, start = 0, time.perf_counter()
+    while True:
+        result, calls = function(), calls + 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_STAGE_TIME: return result, elapsed / calls
+
+def sample(interpreter_class, path: str) -> tuple[dict[str, float], str]:
+    with open(path, 'r', encoding='utf-8') as file: source = file.read()
+    tokens, lex_time = per_call(lambda: Lexer().tokenize(source))
+    _, parse_time = per_call(lambda: Parser(tokens, VariableBank()).parse())
+    interpreter = interpreter_class()
+    interpreter.output = OutputSink(io.StringIO())
+    program = Parser(tokens, interpreter.environment).parse()
+    start = time.perf_counter()
+    interpreter.run(interpreter._optimize(program), os.path.dirname(path))
+    interpreter.output.flush()
+    return {'lex': lex_time, 'parse': parse_time, 'run': time.perf_counter() - start}, interpreter.output.getvalue()
+
+def summarize(samples: list[float]) -> dict:
+    return {'min': min(samples), 'median': statistics.median(samples), 'samples': samples}
+
+def measure(programs: list[str], engines: list[str], repeat: int) -> dict:
+    results = {}
+    for program in programs:
+        path, outputs = os.path.join(PROGRAMS_DIRECTORY, program + '.prose'), {}
+        results[program] = {}
+        for engine in engines:
+            timings = {stage: [] for stage in STAGES}
+            for _ in range(repeat):
+                stages, outputs[engine] = sample(ENGINES[engine], path)
+                for stage, elapsed in stages.items(): timings[stage].append(elapsed)
+            results[program][engine] = {stage: summarize(samples) for stage, samples in timings.items()}
+            print(f"{program:<10} {engine:<9}" + ''.join(f" {stage} {results[program][engine][stage]['min'] * 1000:>9.2f} ms" for stage in STAGES))
+        if len(set(outputs.values())) > 1: raise SystemExit(f"Saída divergente entre os motores no programa '{program}'")
+    return results
+
+def run(arguments: list[str]):
+    engines, repeat, output, programs = list(ENGINES), DEFAULT_REPEAT, None, []
+    for arg in arguments:
+        if arg.startswith("--engine="): engines = arg.split("=", 1)[1].split(",")
+        elif arg.startswith("--repeat=") and arg.split("=", 1)[1].isdigit(): repeat = max(1, int(arg.split("=", 1)[1]))
+        elif arg.startswith("--output="): output = arg.split("=", 1)[1]
+        elif arg in PROGRAMS: programs.append(arg)
+        else: raise SystemExit(USAGE)
+    if not set(engines) <= set(ENGINES): raise SystemExit(f"Erro: motor de execução desconhecido em '{','.join(engines)}'\n{USAGE}")
+    results = measure(programs or list(PROGRAMS), engines, repeat)
+    if output is None: return
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump({'python': platform.python_version(), 'platform': platform.platform(), 'repeat': repeat, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, file, indent=2)
+    print(f"Resultados gravados em '{output}'")
+
+def compare(arguments: list[str]) -> bool:
+    threshold, paths = DEFAULT_THRESHOLD, []
+    for arg in arguments:
+        if arg.startswith("--threshold="): threshold = float(arg.split("=", 1)[1])
+        else: paths.append(arg)
+    if len(paths) != 2: raise SystemExit(USAGE)
+    with open(paths[0], 'r', encoding='utf-8') as file: before = json.load(file)['results']
+    with open(paths[1], 'r', encoding='utf-8') as file: after = json.load(file)['results']
+    regressions = 0
+    print(f"{'programa':<10} {'motor':<9} {'etapa':<6} {'antes (ms)':>11} {'depois (ms)':>12} {'variação':>9}")
+    for program, engines in before.items():
+        for engine, stages in engines.items():
+            for stage, timing in stages.items():
+                current = after.get(program, {}).get(engine, {}).get(stage)
+                if current is None: continue
+                change = current['min'] / timing['min'] - 1 if timing['min'] else 0.0
+                regression = change > threshold
+                regressions += regression
+                print(f"{program:<10} {engine:<9} {stage:<6} {timing['min'] * 1000:>11.2f} {current['min'] * 1000:>12.2f} {change:>+9.1%}" + ("  REGRESSÃO" if regression else ""))
+    print(f"\n{regressions} {'regressão' if regressions == 1 else 'regressões'} acima de {threshold:.0%}" if regressions else f"\nNenhuma regressão acima de {threshold:.0%}")
+    return regressions == 0
+
+def main():
+    command, arguments = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ('', [])
+    if command == 'run': run(arguments)
+    elif command == 'compare': sys.exit(0 if compare(arguments) else 1)
+    else: print(USAGE)
+
+if __name__ == "__main__":
+    main()
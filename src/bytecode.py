@@ -0,0 +1,345 @@
+import os
+import pickle
+from types import MemberDescriptorType
+from typing import TextIO
+from prose_ast import *
+from render import VariableBank, Scope, Symbol, FunctionType, StructInstance, struct_slot
+from lexer import Lexer
+from parsa import Parser
+from interpreter import binary_operation, concatenate, store_token
+from resolver import Resolver
+from optimizer import Optimizer
+
+FORMAT_VERSION = 16
+MAGIC = b'PROSEC' + FORMAT_VERSION.to_bytes(2, 'little')
+CACHE_DIRECTORY = '__prosecache__'
+CACHE_EXTENSION = '.prosec'
+
+OPCODE_NAMES = (
+    'LOAD_CONST', 'LOAD_GLOBAL', 'STORE_GLOBAL', 'LOAD_LOCAL', 'STORE_LOCAL', 'LOAD_DEREF', 'STORE_DEREF',
+    'CREATE', 'DECLARE', 'LOAD_DEFAULT', 'POP_TOP',
+    'BINARY_OP', 'BINARY_CONCAT',
+    'JUMP', 'JUMP_IF_FALSE', 'JUMP_IF_TRUE', 'PUSH_SCOPE', 'POP_SCOPE', 'NEW_FRAME', 'ENTER_FRAME', 'GET_ITER', 'FOR_ITER', 'BIND_LOOP', 'FOR_BIND',
+    'CHECK_CALLABLE', 'CALL', 'TAIL_CALL', 'CALL_NATIVE', 'RETURN_VALUE', 'RETURN_NONE', 'HALT',
+    'MAKE_FUNCTION', 'DEFINE_STRUCT', 'IMPORT', 'BUILD_LIST', 'BUILD_MAP', 'LOAD_INDEX', 'STORE_INDEX', 'LOAD_MEMBER', 'LOAD_FIELD', 'STORE_MEMBER',
+    'WRITE', 'READ', 'READ_PROMPT', 'RAISE',
+    'PROFILE_LINE', 'PROFILE_ENTER', 'PROFILE_EXIT',
+)
+(LOAD_CONST, LOAD_GLOBAL, STORE_GLOBAL, LOAD_LOCAL, STORE_LOCAL, LOAD_DEREF, STORE_DEREF,
+ CREATE, DECLARE, LOAD_DEFAULT, POP_TOP,
+ BINARY_OP, BINARY_CONCAT,
+ JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE, PUSH_SCOPE, POP_SCOPE, NEW_FRAME, ENTER_FRAME, GET_ITER, FOR_ITER, BIND_LOOP, FOR_BIND,
+ CHECK_CALLABLE, CALL, TAIL_CALL, CALL_NATIVE, RETURN_VALUE, RETURN_NONE, HALT,
+ MAKE_FUNCTION, DEFINE_STRUCT, IMPORT, BUILD_LIST, BUILD_MAP, LOAD_INDEX, STORE_INDEX, LOAD_MEMBER, LOAD_FIELD, STORE_MEMBER,
+ WRITE, READ, READ_PROMPT, RAISE,
+ PROFILE_LINE, PROFILE_ENTER, PROFILE_EXIT) = range(len(OPCODE_NAMES))
+
+DECLARATION_NODES = (FunctionDeclaration, StructDefinition, ImportStatement)
+
+class CodeObject:
+    def __init__(self, name: str):
+        self.name = name
+        self.code: list[int] = []
+        self.constants: list = []
+        self.eliminated_nodes = 0
+        self.imports: list[str] = []
+
+    def emit(self, op: int, arg: int = 0) -> int:
+        self.code += (op, arg)
+        return len(self.code) - 1
+
+    def constant(self, value) -> int:
+        self.constants.append(value)
+        return len(self.constants) - 1
+
+    def patch(self, position: int, target: int): self.code[position] = target
+
+    def __repr__(self): return f"<CodeObject {self.name}>"
+
+class FunctionCode:
+    def __init__(self, name: str, parameters: list[tuple[Symbol, bool]], function_type: FunctionType, code: CodeObject, scope: Scope):
+        self.name = name
+        self.parameters = parameters
+        self.function_type = function_type
+        self.code = code
+        self.scope = scope
+
+def disassemble(code_object: CodeObject) -> str:
+    lines = []
+    for pc in range(0, len(code_object.code), 2):
+        op, arg = code_object.code[pc], code_object.code[pc + 1]
+        lines.append(f"{pc:>5} {OPCODE_NAMES[op]:<18} {arg}")
+    return '\n'.join(lines)
+
+class BytecodeCompiler:
+    def __init__(self, varbank: VariableBank, elide_scopes=True, profile=False):
+        self.varbank = varbank
+        self.elide_scopes = elide_scopes
+        self.profile = profile
+        self.in_function = False
+        self.code: CodeObject = None
+
+    def compile_program(self, nodes: list[Statement], name='<module>') -> CodeObject:
+        self.code = CodeObject(name)
+        Resolver(self.elide_scopes, self.varbank).resolve(nodes)
+        for node in nodes:
+            if isinstance(node, DECLARATION_NODES): self.compile(node)
+        for node in nodes:
+            if not isinstance(node, DECLARATION_NODES): self.compile(node)
+        self.code.emit(HALT)
+        return self.code
+
+    def compile(self, node):
+        compiler = getattr(self, f'compile_{type(node).__name__}', None)
+        if compiler is None: raise Exception(f'Nenhum método compile_{type(node).__name__} encontrado para o nó {node}')
+        if self.profile and isinstance(node, Statement): self.code.emit(PROFILE_LINE, self.code.constant(node.location))
+        compiler(node)
+
+    def _profile_exit(self):
+        if self.profile and self.in_function: self.code.emit(PROFILE_EXIT)
+
+    def compile_block(self, statements: list[Statement]):
+        for statement in statements: self.compile(statement)
+
+    def compile_scoped_block(self, statements: list[Statement], scope: Scope):
+        if scope.elided:
+            self.compile_block(statements)
+            return
+        self.code.emit(PUSH_SCOPE, self.code.constant(scope))
+        self.compile_block(statements)
+        self.code.emit(POP_SCOPE)
+
+    def compile_loop_body(self, statements: list[Statement], scope: Scope):
+        if not scope.reusable:
+            self.compile_scoped_block(statements, scope)
+            return
+        self.code.emit(ENTER_FRAME)
+        self.compile_block(statements)
+        self.code.emit(POP_SCOPE)
+
+    def _resolve_type(self, type_node: TypeNode) -> Type | None:
+        try: return type_node.to_type_object()
+        except Exception as e:
+            self.code.emit(RAISE, self.code.constant(str(e)))
+            return None
+
+    def compile_ImportStatement(self, node: ImportStatement):
+        self.code.emit(IMPORT, self.code.constant(node))
+
+    def compile_StructDefinition(self, node: StructDefinition):
+        self.code.emit(DEFINE_STRUCT, self.code.constant(self.varbank.get_struct_type(node.name.value)))
+
+    def compile_FunctionDeclaration(self, node: FunctionDeclaration):
+        param_types = []
+        for type_node, _ in node.params:
+            param_type = self._resolve_type(type_node)
+            if param_type is None: return
+            param_types.append(param_type)
+        return_type = self._resolve_type(node.return_type_node)
+        if return_type is None: return
+        enclosing, in_function, self.code, self.in_function = self.code, self.in_function, CodeObject(node.name.value), True
+        if self.profile: self.code.emit(PROFILE_ENTER, self.code.constant((node.name.value, *node.location)))
+        self.compile_block(node.body)
+        self._profile_exit()
+        self.code.emit(RETURN_NONE)
+        body, self.code, self.in_function = self.code, enclosing, in_function
+        function_type = FunctionType(param_types, return_type)
+        function_code = FunctionCode(node.name.value, node.param_bindings, function_type, body, node.scope)
+        self.code.emit(MAKE_FUNCTION, self.code.constant(function_code))
+        self._declare(node.symbol, node.redeclaration, (node.name.value, True, function_type))
+
+    def compile_CreateStatement(self, node: CreateStatement):
+        var_type = self._resolve_type(node.type_node)
+        if var_type is None: return
+        if node.expression: self.compile(node.expression)
+        else: self.code.emit(LOAD_DEFAULT, self.code.constant(var_type))
+        self._declare(node.symbol, node.redeclaration, (node.identifier.value, node.const_or_var.value == 'constant', var_type))
+
+    def _declare(self, symbol: Symbol | None, redeclaration: bool, target: tuple):
+        if symbol is None: self.code.emit(CREATE, self.code.constant(target))
+        else: self.code.emit(DECLARE, self.code.constant((symbol, redeclaration)))
+
+    def compile_SetStatement(self, node: SetStatement):
+        self.compile(node.expression)
+        address = node.address
+        if address is None: self.code.emit(STORE_GLOBAL, self.code.constant(node.identifier.value))
+        elif address.depth == 0 and address.bound and not address.symbol.constant and not address.symbol.boxed: self.code.emit(STORE_LOCAL, address.symbol.slot)
+        else: self.code.emit(STORE_DEREF, self.code.constant(address))
+
+    def compile_MemberAssignmentStatement(self, node: MemberAssignmentStatement):
+        self.compile(node.member_access.obj)
+        self.compile(node.expression)
+        self.code.emit(STORE_MEMBER, self.code.constant((node.member_access.field, node.member_access.member)))
+
+    def compile_ListAssignmentStatement(self, node: ListAssignmentStatement):
+        self.compile(node.list_access.list_expr)
+        self.compile(node.list_access.index_expression)
+        self.compile(node.expression)
+        self.code.emit(STORE_INDEX, self.code.constant(store_token(node)))
+
+    def compile_ExpressionStatement(self, node: ExpressionStatement):
+        self.compile(node.expression)
+        self.code.emit(POP_TOP)
+
+    def compile_WriteStatement(self, node: WriteStatement):
+        self.compile(node.expression)
+        self.code.emit(WRITE, self.code.constant(('', node.expression.static_type)))
+
+    def compile_WriteLnStatement(self, node: WriteLnStatement):
+        self.compile(node.expression)
+        self.code.emit(WRITE, self.code.constant(('\n', node.expression.static_type)))
+
+    def compile_ReadStatement(self, node: ReadStatement):
+        self.code.emit(READ, self.code.constant((node.identifier, node.address)))
+
+    def compile_ReadmeStatement(self, node: ReadmeStatement):
+        self.compile(node.prompt_expression)
+        self.code.emit(READ_PROMPT, self.code.constant((node.target_variable, node.address)))
+
+    def compile_ReturnStatement(self, node: ReturnStatement):
+        if node.expression is None:
+            self._profile_exit()
+            self.code.emit(RETURN_NONE)
+            return
+        if node.tail_call:
+            self.compile_FunctionCall(node.expression, TAIL_CALL)
+            return
+        self.compile(node.expression)
+        self._profile_exit()
+        self.code.emit(RETURN_VALUE, self.code.constant(node.expression.static_type))
+
+    def compile_IfStructure(self, node: IfStructure):
+        exits = []
+        for condition, body, scope in zip(node.conditions, node.bodies, node.scopes):
+            self.compile(condition)
+            skip = self.code.emit(JUMP_IF_FALSE)
+            self.compile_scoped_block(body, scope)
+            exits.append(self.code.emit(JUMP))
+            self.code.patch(skip, len(self.code.code))
+        if node.else_body: self.compile_scoped_block(node.else_body, node.else_scope)
+        for position in exits: self.code.patch(position, len(self.code.code))
+
+    def compile_WhileStructure(self, node: WhileStructure):
+        if node.scope.reusable: self.code.emit(NEW_FRAME, self.code.constant(node.scope))
+        start = len(self.code.code)
+        self.compile(node.condition)
+        exit_jump = self.code.emit(JUMP_IF_FALSE)
+        self.compile_loop_body(node.body, node.scope)
+        self.code.emit(JUMP, start)
+        self.code.patch(exit_jump, len(self.code.code))
+        if node.scope.reusable: self.code.emit(POP_TOP)
+
+    def compile_DoWhileStructure(self, node: DoWhileStructure):
+        if node.scope.reusable: self.code.emit(NEW_FRAME, self.code.constant(node.scope))
+        start = len(self.code.code)
+        self.compile_loop_body(node.body, node.scope)
+        self.compile(node.condition)
+        self.code.emit(JUMP_IF_TRUE, start)
+        if node.scope.reusable: self.code.emit(POP_TOP)
+
+    def compile_ForStructure(self, node: ForStructure):
+        self.compile(node.iterable_expression)
+        if node.scope.reusable:
+            self.code.emit(GET_ITER, self.code.constant((node.loop_variable, node.iterable_expression.static_type, node.scope, node.symbol.slot)))
+            start = len(self.code.code)
+            exit_jump = self.code.emit(FOR_BIND)
+        else:
+            self.code.emit(GET_ITER, self.code.constant((node.loop_variable, node.iterable_expression.static_type)))
+            start = len(self.code.code)
+            exit_jump = self.code.emit(FOR_ITER)
+            self.code.emit(BIND_LOOP, self.code.constant((node.scope, node.symbol.slot)))
+        self.compile_block(node.body)
+        self.code.emit(POP_SCOPE)
+        self.code.emit(JUMP, start)
+        self.code.patch(exit_jump, len(self.code.code))
+
+    def compile_Constant(self, node: Constant):
+        self.code.emit(LOAD_CONST, self.code.constant(node.value))
+
+    def compile_Value(self, node: Value):
+        token_type, value = node.token.token_type, node.token.value
+        if token_type == TokenType.IDENTIFIER:
+            address = node.address
+            if address is None: self.code.emit(LOAD_GLOBAL, self.code.constant(value))
+            elif address.depth == 0 and address.bound and not address.symbol.boxed: self.code.emit(LOAD_LOCAL, address.symbol.slot)
+            else: self.code.emit(LOAD_DEREF, self.code.constant(address))
+            return
+        self.code.emit(LOAD_CONST, self.code.constant(literal_value(node.token)))
+
+    def compile_BinOp(self, node: BinOp):
+        self.compile(node.left)
+        self.compile(node.right)
+        operation = node.operation = binary_operation(node)
+        if operation is concatenate: self.code.emit(BINARY_CONCAT)
+        else: self.code.emit(BINARY_OP, self.code.constant((node.op, operation, node.left.static_type, node.right.static_type)))
+
+    def compile_FunctionCall(self, node: FunctionCall, call_op=CALL):
+        if node.native:
+            for argument in node.arguments: self.compile(argument)
+            self.code.emit(CALL_NATIVE, self.code.constant((node.native, node.callee.token, len(node.arguments))))
+            return
+        self.compile(node.callee)
+        callee_token = node.callee.token if isinstance(node.callee, Value) else Token(TokenType.NONE, '', 0, 0)
+        self.code.emit(CHECK_CALLABLE, self.code.constant((callee_token, node.callee.static_type)))
+        for argument in node.arguments: self.compile(argument)
+        if call_op == TAIL_CALL: self._profile_exit()
+        self.code.emit(call_op, self.code.constant((len(node.arguments), callee_token)))
+
+    def compile_ListLiteral(self, node: ListLiteral):
+        for element in node.elements: self.compile(element)
+        self.code.emit(BUILD_LIST, len(node.elements))
+
+    def compile_MapLiteral(self, node: MapLiteral):
+        for key, value in zip(node.keys, node.values): self.compile(key); self.compile(value)
+        self.code.emit(BUILD_MAP, len(node.keys))
+
+    def compile_ListAccess(self, node: ListAccess):
+        self.compile(node.list_expr)
+        self.compile(node.index_expression)
+        list_token = node.list_expr.token if isinstance(node.list_expr, Value) else Token(TokenType.NONE, '', 0, 0)
+        self.code.emit(LOAD_INDEX, self.code.constant(list_token))
+
+    def compile_MemberAccess(self, node: MemberAccess):
+        self.compile(node.obj)
+        if node.field is not None: self.code.emit(LOAD_FIELD, self.code.constant((node.field, node.member)))
+        else: self.code.emit(LOAD_MEMBER, self.code.constant((node.member, node.obj.static_type)))
+
+def compile_source(source: str | TextIO, varbank: VariableBank, name='<module>', elide_scopes=True, optimizer: Optimizer | None = None) -> CodeObject:
+    parser = Parser(Lexer().stream(source), varbank)
+    syntax_tree = parser.parse()
+    if optimizer: syntax_tree = optimizer.optimize(syntax_tree)
+    code = BytecodeCompiler(varbank, elide_scopes).compile_program(syntax_tree, name)
+    code.eliminated_nodes, code.imports = optimizer.eliminated if optimizer else 0, parser.imports
+    return code
+
+def cache_path(source_path: str) -> str:
+    directory, file_name = os.path.split(os.path.abspath(source_path))
+    return os.path.join(directory, CACHE_DIRECTORY, os.path.splitext(file_name)[0] + CACHE_EXTENSION)
+
+class CodePickler(pickle.Pickler):
+    def reducer_override(self, obj):
+        if isinstance(obj, MemberDescriptorType) and issubclass(obj.__objclass__, StructInstance): return struct_slot, (obj.__objclass__.struct_type, obj.__name__)
+        return NotImplemented
+
+def _source_key(stat: os.stat_result) -> bytes:
+    return stat.st_mtime_ns.to_bytes(8, 'little') + stat.st_size.to_bytes(8, 'little')
+
+def load_program(file: TextIO, varbank: VariableBank, optimizer: Optimizer | None = None) -> CodeObject:
+    key, path = _source_key(os.fstat(file.fileno())), cache_path(file.name)
+    try:
+        with open(path, 'rb') as cache:
+            if cache.read(len(MAGIC) + len(key)) == MAGIC + key:
+                return pickle.load(cache)
+    except Exception:
+        pass
+    code = compile_source(file, varbank, os.path.basename(file.name), optimizer=optimizer)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as cache:
+            cache.write(MAGIC + key)
+            CodePickler(cache, pickle.HIGHEST_PROTOCOL).dump(code)
+        os.replace(temporary_path, path)
+    except OSError:
+        pass
+    return code
@@ -0,0 +1,381 @@
+import sys
+from functools import partial
+from prose_ast import *
+from render import VariableBank, Variable, Frame, FunctionType, CompactList
+from interpreter import Interpreter, ProseFunction, ValueWrapper, ReturnSignal, TailCall, type_of, invalid_operation, binary_operation, concatenate, loop_items, missing_member, member_field, compact_list_error, store_token
+from resolver import Resolver
+
+DECLARATION_NODES = (FunctionDeclaration, StructDefinition, ImportStatement)
+
+def static_type(type_node: TypeNode):
+    try: resolved = type_node.to_type_object()
+    except Exception: return type_node.to_type_object
+    return lambda: resolved
+
+def enter_scope(scope: Scope):
+    if scope.elided: return lambda env: env
+    return partial(Frame, scope)
+
+class CompiledFunction(ProseFunction):
+    def __init__(self, declaration: FunctionDeclaration, closure: VariableBank | Frame, body, parameters: list):
+        super().__init__(declaration, closure)
+        self.body = body
+        self.parameters = parameters
+
+class ClosureCompiler:
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+
+    def compile(self, node):
+        compiler = getattr(self, f'compile_{type(node).__name__}', None)
+        if compiler is None: raise Exception(f'Nenhum método compile_{type(node).__name__} encontrado para o nó {node}')
+        return compiler(node)
+
+    def compile_block(self, statements: list[Statement]) -> tuple:
+        return tuple(self.compile(statement) for statement in statements)
+
+    def compile_sequence(self, statements: list[Statement]):
+        body = self.compile_block(statements)
+        if len(body) == 1: return body[0]
+        def sequence(env):
+            for statement in body:
+                completion = statement(env)
+                if completion is not None: return completion
+        return sequence
+
+    def compile_ImportStatement(self, node: ImportStatement):
+        bind_import = self.interpreter._import
+        def import_statement(env): bind_import(node, env)
+        return import_statement
+
+    def compile_StructDefinition(self, node: StructDefinition):
+        def struct_definition(env): pass
+        return struct_definition
+
+    def compile_FunctionDeclaration(self, node: FunctionDeclaration):
+        name = node.name.value
+        body = self.compile_sequence(node.body)
+        symbol, redeclaration = node.symbol, node.redeclaration
+        def function_declaration(env):
+            param_types = [p[0].to_type_object() for p in node.params]
+            return_type = node.return_type_node.to_type_object()
+            function = CompiledFunction(node, env, body, node.param_bindings)
+            if symbol is None: env.create(name, True, FunctionType(param_types, return_type), function)
+            else: env.declare(symbol, redeclaration, function)
+        return function_declaration
+
+    def compile_CreateStatement(self, node: CreateStatement):
+        var_type = static_type(node.type_node)
+        expression = self.compile(node.expression) if node.expression else None
+        name, constant = node.identifier.value, node.const_or_var.value == 'constant'
+        initial_value = self.interpreter._initial_value
+        symbol, redeclaration = node.symbol, node.redeclaration
+        if symbol is None:
+            def create_statement(env):
+                resolved_type = var_type()
+                value = expression(env) if expression else initial_value(resolved_type)
+                env.create(name, constant, resolved_type, value)
+            return create_statement
+        def create_local(env):
+            resolved_type = var_type()
+            env.declare(symbol, redeclaration, expression(env) if expression else initial_value(resolved_type))
+        return create_local
+
+    def compile_SetStatement(self, node: SetStatement):
+        name, expression, address = node.identifier.value, self.compile(node.expression), node.address
+        if address is None:
+            def set_statement(env): env.globals.set(name, expression(env))
+            return set_statement
+        if address.depth == 0 and address.bound and not address.symbol.constant and not address.symbol.boxed:
+            slot = address.symbol.slot
+            def set_local(env): env.slots[slot] = expression(env)
+            return set_local
+        def set_enclosing(env): env.store(address, expression(env))
+        return set_enclosing
+
+    def compile_MemberAssignmentStatement(self, node: MemberAssignmentStatement):
+        target, field, member = self.compile(node.member_access.obj), node.member_access.field, node.member_access.member
+        expression = self.compile(node.expression)
+        if field is not None:
+            store = field.__set__
+            def field_assignment(env):
+                obj, value = target(env), expression(env)
+                if obj is None: raise missing_member(member)
+                store(obj, value)
+            return field_assignment
+        def member_assignment(env):
+            obj, value = target(env), expression(env)
+            member_field(obj, member).__set__(obj, value)
+        return member_assignment
+
+    def compile_ListAssignmentStatement(self, node: ListAssignmentStatement):
+        target, index = self.compile(node.list_access.list_expr), self.compile(node.list_access.index_expression)
+        expression, token = self.compile(node.expression), store_token(node)
+        def list_assignment(env):
+            values, position, value = target(env), index(env), expression(env)
+            try:
+                values[position] = value
+            except (OverflowError, TypeError):
+                if isinstance(values, CompactList): raise compact_list_error(values, token)
+                raise
+        return list_assignment
+
+    def compile_ExpressionStatement(self, node: ExpressionStatement):
+        expression = self.compile(node.expression)
+        def expression_statement(env): expression(env)
+        return expression_statement
+
+    def compile_WriteStatement(self, node: WriteStatement):
+        return self._compile_write(node, '')
+
+    def compile_WriteLnStatement(self, node: WriteLnStatement):
+        return self._compile_write(node, '\n')
+
+    def _compile_write(self, node: BaseWriteStatement, end: str):
+        expression, write, static_type = self.compile(node.expression), self.interpreter._write, node.expression.static_type
+        def write_statement(env): write(expression(env), static_type, end)
+        return write_statement
+
+    def compile_ReadStatement(self, node: ReadStatement):
+        address, token = node.address, node.identifier
+        input_type, store_input, read_line = self.interpreter._input_type, self.interpreter._store_input, self.interpreter._read_line
+        def read_statement(env):
+            var_type = input_type(env, address, token)
+            store_input(env, address, var_type, read_line(token), token)
+        return read_statement
+
+    def compile_ReadmeStatement(self, node: ReadmeStatement):
+        prompt, address, token = self.compile(node.prompt_expression), node.address, node.target_variable
+        input_type, store_input, read_line = self.interpreter._input_type, self.interpreter._store_input, self.interpreter._read_line
+        def readme_statement(env):
+            user_input = read_line(token, prompt(env))
+            store_input(env, address, input_type(env, address, token), user_input, token)
+        return readme_statement
+
+    def compile_ReturnStatement(self, node: ReturnStatement):
+        if node.tail_call: return self._compile_call_preparation(node.expression)
+        if node.expression is None:
+            def return_void(env): return ValueWrapper(None, VOID)
+            return return_void
+        expression, static_type = self.compile(node.expression), node.expression.static_type
+        def return_statement(env): return ValueWrapper(expression(env), static_type)
+        return return_statement
+
+    def compile_IfStructure(self, node: IfStructure):
+        branches = [(self.compile(condition), self.compile_sequence(body), enter_scope(scope)) for condition, body, scope in zip(node.conditions, node.bodies, node.scopes)]
+        else_body = self.compile_sequence(node.else_body) if node.else_body else None
+        enter_else = enter_scope(node.else_scope) if node.else_body else None
+        def if_structure(env):
+            for condition, body, enter in branches:
+                if condition(env): return body(enter(env))
+            if else_body: return else_body(enter_else(env))
+        return if_structure
+
+    def compile_WhileStructure(self, node: WhileStructure):
+        condition, body, scope = self.compile(node.condition), self.compile_sequence(node.body), node.scope
+        if scope.elided:
+            def while_structure(env):
+                while condition(env):
+                    completion = body(env)
+                    if completion is not None: return completion
+            return while_structure
+        if scope.reusable:
+            def while_reusing_frame(env):
+                frame = Frame(scope, env)
+                while condition(env):
+                    frame.reset()
+                    completion = body(frame)
+                    if completion is not None: return completion
+            return while_reusing_frame
+        def while_with_frames(env):
+            while condition(env):
+                completion = body(Frame(scope, env))
+                if completion is not None: return completion
+        return while_with_frames
+
+    def compile_DoWhileStructure(self, node: DoWhileStructure):
+        condition, body, scope = self.compile(node.condition), self.compile_sequence(node.body), node.scope
+        if scope.elided:
+            def do_while_structure(env):
+                while True:
+                    completion = body(env)
+                    if completion is not None: return completion
+                    if not condition(env): break
+            return do_while_structure
+        if scope.reusable:
+            def do_while_reusing_frame(env):
+                frame = Frame(scope, env)
+                while True:
+                    frame.reset()
+                    completion = body(frame)
+                    if completion is not None: return completion
+                    if not condition(env): break
+            return do_while_reusing_frame
+        def do_while_with_frames(env):
+            while True:
+                completion = body(Frame(scope, env))
+                if completion is not None: return completion
+                if not condition(env): break
+        return do_while_with_frames
+
+    def compile_ForStructure(self, node: ForStructure):
+        iterable, body, scope, slot = self.compile(node.iterable_expression), self.compile_sequence(node.body), node.scope, node.symbol.slot
+        static_type, element_type_of = node.iterable_expression.static_type, self.interpreter._element_type
+        def for_structure(env):
+            iterable_value = iterable(env)
+            element_type = element_type_of(iterable_value, static_type, node.loop_variable)
+            iterable_value = loop_items(iterable_value)
+            if scope.reusable:
+                loop_env, loop_variable = Frame(scope, env), Variable(True, element_type, None)
+                slots, reset = loop_env.slots, loop_env.reset
+                for item in iterable_value:
+                    reset()
+                    loop_variable.value = item
+                    slots[slot] = loop_variable
+                    completion = body(loop_env)
+                    if completion is not None: return completion
+                return
+            for item in iterable_value:
+                loop_env = Frame(scope, env)
+                loop_env.slots[slot] = Variable(True, element_type, item)
+                completion = body(loop_env)
+                if completion is not None: return completion
+        return for_structure
+
+    def compile_Constant(self, node: Constant):
+        constant = node.value
+        def literal(env): return constant
+        return literal
+
+    def compile_Value(self, node: Value):
+        token_type, value = node.token.token_type, node.token.value
+        if token_type == TokenType.IDENTIFIER:
+            address = node.address
+            if address is None:
+                def global_identifier(env): return env.globals.get(value).value
+                return global_identifier
+            if address.depth == 0 and address.bound and not address.symbol.boxed:
+                slot = address.symbol.slot
+                def local_identifier(env): return env.slots[slot]
+                return local_identifier
+            def identifier(env): return env.load(address)
+            return identifier
+        constant = literal_value(node.token)
+        def literal(env): return constant
+        return literal
+
+    def compile_BinOp(self, node: BinOp):
+        left, right, op_token = self.compile(node.left), self.compile(node.right), node.op
+        left_type, right_type = node.left.static_type, node.right.static_type
+        operation = node.operation = binary_operation(node)
+        if operation is concatenate:
+            def concatenation(env): return str(left(env)) + str(right(env))
+            return concatenation
+        def binary_op(env):
+            left_value, right_value = left(env), right(env)
+            try:
+                return operation(left_value, right_value)
+            except ZeroDivisionError:
+                raise RuntimeException("Divisão por zero.", op_token)
+            except TypeError:
+                raise invalid_operation(op_token, left_value, right_value, left_type, right_type)
+        return binary_op
+
+    def compile_FunctionCall(self, node: FunctionCall):
+        if node.native:
+            arguments = [self.compile(argument) for argument in node.arguments]
+            native, name_token, call_native = node.native, node.callee.token, self.interpreter._call_native
+            def native_call(env): return call_native(native, name_token, [argument(env) for argument in arguments])
+            return native_call
+        arguments = [self.compile(argument) for argument in node.arguments]
+        callee, callee_token, call_function, callee_type = self.compile(node.callee), error_token(node.callee), self.interpreter._call_function, node.callee.static_type
+        def function_call(env):
+            func_obj = callee(env)
+            if not isinstance(func_obj, ProseFunction):
+                raise RuntimeException(f"Expressão do tipo '{type_of(func_obj, callee_type)}' não é chamável.", callee_token)
+            return call_function(TailCall(func_obj, [argument(env) for argument in arguments], callee_token))
+        return function_call
+
+    def _compile_call_preparation(self, node: FunctionCall):
+        arguments = [self.compile(argument) for argument in node.arguments]
+        callee, callee_token, callee_type = self.compile(node.callee), error_token(node.callee), node.callee.static_type
+        def prepare_call(env):
+            func_obj = callee(env)
+            if not isinstance(func_obj, ProseFunction):
+                raise RuntimeException(f"Expressão do tipo '{type_of(func_obj, callee_type)}' não é chamável.", callee_token)
+            return TailCall(func_obj, [argument(env) for argument in arguments], callee_token)
+        return prepare_call
+
+    def compile_ListLiteral(self, node: ListLiteral):
+        elements = [self.compile(element) for element in node.elements]
+        def list_literal(env): return [element(env) for element in elements]
+        return list_literal
+
+    def compile_MapLiteral(self, node: MapLiteral):
+        entries = [(self.compile(key), self.compile(value)) for key, value in zip(node.keys, node.values)]
+        def map_literal(env): return {key(env): value(env) for key, value in entries}
+        return map_literal
+
+    def compile_ListAccess(self, node: ListAccess):
+        target, index, target_token = self.compile(node.list_expr), self.compile(node.index_expression), error_token(node.list_expr)
+        def list_access(env):
+            values, position = target(env), index(env)
+            try:
+                return values[position]
+            except IndexError:
+                raise RuntimeException(f"Índice {position} fora dos limites da lista.", target_token)
+            except KeyError:
+                raise RuntimeException(f"Chave {position!r} não encontrada no mapa.", target_token)
+        return list_access
+
+    def compile_MemberAccess(self, node: MemberAccess):
+        target, member, access_member, static_type = self.compile(node.obj), node.member, self.interpreter._access_member, node.obj.static_type
+        if node.field is not None:
+            load = node.field.__get__
+            def field_access(env):
+                obj = target(env)
+                if obj is None: raise missing_member(member)
+                return load(obj)
+            return field_access
+        def member_access(env): return access_member(target(env), static_type, member)
+        return member_access
+
+class CompiledInterpreter(Interpreter):
+    def __init__(self):
+        super().__init__()
+        self.compiler = ClosureCompiler(self)
+
+    def run(self, nodes, base_path='.'):
+        previous_path, previous_limit = getattr(self, 'base_path', '.'), self._reserve_python_stack()
+        self.base_path = base_path
+        try:
+            Resolver(self.elide_scopes, self.environment).resolve(nodes)
+
+            declarations = [self.compiler.compile(node) for node in nodes if isinstance(node, DECLARATION_NODES)]
+            statements = [self.compiler.compile(node) for node in nodes if not isinstance(node, DECLARATION_NODES)]
+            environment = self.environment
+            for statement in declarations: statement(environment)
+            for statement in statements:
+                completion = statement(environment)
+                if completion is not None: raise ReturnSignal(ValueWrapper(completion.value, type_of(completion.value, completion.type)))
+        finally:
+            self.base_path = previous_path
+            sys.setrecursionlimit(previous_limit)
+
+    def _call_function(self, call: TailCall) -> object:
+        if self.call_depth >= self.max_call_depth: raise self._stack_overflow(call.token)
+        self.call_depth += 1
+        try:
+            while True:
+                func_obj = call.function
+                scope = func_obj.declaration.scope
+                func_env = func_obj.closure if scope.elided else Frame(scope, func_obj.closure)
+                for i, (symbol, redeclaration) in enumerate(func_obj.parameters):
+                    func_env.declare(symbol, redeclaration, call.arguments[i])
+                completion = func_obj.body(func_env)
+                if type(completion) is not TailCall: return None if completion is None else completion.value
+                call = completion
+        except RecursionError:
+            raise self._stack_overflow(call.token)
+        finally:
+            self.call_depth -= 1
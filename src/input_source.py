@@ -0,0 +1,33 @@
+import sys
+from typing import TextIO
+
+def strip_newline(line: str) -> str:
+    return line[:-1] if line.endswith('\n') else line
+
+class InputSource:
+    def __init__(self, stream: TextIO | None = None):
+        self.stream = stream
+        self.pending: str | None = None
+
+    def _stream(self) -> TextIO:
+        return self.stream if self.stream is not None else sys.stdin
+
+    def _next(self) -> str:
+        if self.pending is None: return self._stream().readline()
+        line, self.pending = self.pending, None
+        return line
+
+    def read_line(self) -> str:
+        line = self._next()
+        if not line: raise EOFError("Fim da entrada")
+        return strip_newline(line)
+
+    def read_lines(self) -> list[str]:
+        remaining = self._next() + self._stream().read()
+        lines = remaining.split('\n')
+        if lines[-1] == '': lines.pop()
+        return lines
+
+    def at_end(self) -> bool:
+        if self.pending is None: self.pending = self._stream().readline()
+        return self.pending == ''
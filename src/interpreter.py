@@ -1,9 +1,18 @@
-import os
+import sys
+import operator
+from functools import partial
+from typing import TextIO
 from prose_ast import *
-from render import (VariableBank, FunctionType, IntegerType, RationalType, 
-                    StringType, BooleanType, ListType, StructType, VoidType)
+from render import (VariableBank, Variable, Frame, FunctionType, IntegerType, RationalType, 
+                    StringType, BooleanType, ListType, MapType, StructType, BuilderType, RangeType, StringBuilder, BUILDER, RANGE,
+                    CompactList, COMPACT_TYPECODES, StructInstance, struct_class)
 from lexer import Lexer
 from parsa import Parser
+from resolver import Resolver
+from optimizer import Optimizer
+from modules import ModuleRegistry
+from output import OutputSink
+from input_source import InputSource
 
 class ValueWrapper:
     def __init__(self, value, value_type: Type):
@@ -15,16 +24,80 @@ class ReturnSignal(Exception):
     def __init__(self, value_wrapper: ValueWrapper):
         self.value_wrapper = value_wrapper
 
+class TailCall:
+    __slots__ = ('function', 'arguments', 'token')
+    def __init__(self, function, arguments: list, token: Token):
+        self.function = function
+        self.arguments = arguments
+        self.token = token
+
+def type_of(value, static_type: Type | None = None) -> Type:
+    if static_type is not None: return static_type
+    if isinstance(value, bool): return BOOLEAN
+    if isinstance(value, int): return INTEGER
+    if isinstance(value, float): return RATIONAL
+    if isinstance(value, str): return STRING
+    if isinstance(value, list): return ListType(type_of(value[0]) if value else None)
+    if isinstance(value, dict): return MapType(*map(type_of, next(iter(value.items())))) if value else MapType(None, None)
+    if isinstance(value, CompactList): return ListType(INTEGER if value.typecode == 'q' else RATIONAL)
+    if isinstance(value, StringBuilder): return BUILDER
+    if isinstance(value, range): return RANGE
+    if isinstance(value, StructInstance): return value.struct_type
+    if isinstance(value, ProseFunction): return value.function_type()
+    if isinstance(value, ModuleInstance): return ModuleType(value.name)
+    return VOID
+
+def loop_items(iterable): return list(iterable) if isinstance(iterable, dict) else iterable
+
+def concatenate(left, right): return str(left) + str(right)
+def logical_and(left, right): return left and right
+def logical_or(left, right): return left or right
+def unknown_operator(op: TokenType, left, right): raise Exception(f"Operador binário desconhecido: {op}")
+
+def dynamic_addition(left, right):
+    if isinstance(left, str) or isinstance(right, str): return str(left) + str(right)
+    return left + right
+
+BINARY_OPERATIONS = {
+    TokenType.ADDITION: operator.add, TokenType.SUBTRACTION: operator.sub, TokenType.MULTIPLICATION: operator.mul,
+    TokenType.DIVISION: operator.truediv, TokenType.MODULUS: operator.mod,
+    TokenType.GREATER: operator.gt, TokenType.LESS: operator.lt, TokenType.GREATER_EQUAL: operator.ge, TokenType.LESS_EQUAL: operator.le,
+    TokenType.EQUAL: operator.eq, TokenType.NOT_EQUAL: operator.ne, TokenType.AND: logical_and, TokenType.OR: logical_or,
+}
+
+def binary_operation(node: BinOp):
+    op, left_type, right_type = node.op.token_type, node.left.static_type, node.right.static_type
+    if op == TokenType.ADDITION and (isinstance(left_type, StringType) or isinstance(right_type, StringType)): return concatenate
+    if op == TokenType.ADDITION and (left_type is None or right_type is None): return dynamic_addition
+    return BINARY_OPERATIONS.get(op) or partial(unknown_operator, op)
+
+def invalid_operation(token: Token, left, right, left_type: Type | None, right_type: Type | None) -> RuntimeException:
+    return RuntimeException(f"Operação inválida entre os tipos {type_of(left, left_type)} e {type_of(right, right_type)}.", token)
+
+MAX_CALL_DEPTH = 10000
+PYTHON_FRAMES_PER_CALL = 50
+
 class ProseFunction:
     def __init__(self, declaration: FunctionDeclaration, closure: VariableBank):
         self.declaration = declaration
         self.closure = closure
+    def function_type(self) -> FunctionType: return FunctionType([p[0].to_type_object() for p in self.declaration.params], self.declaration.return_type_node.to_type_object())
     def __repr__(self): return f"<ProseFunction {self.declaration.name.value}>"
 
-class StructInstance:
-    def __repr__(self):
-        fields = ', '.join(f'{k}={v}' for k, v in vars(self).items())
-        return f"<StructInstance {fields}>"
+def missing_member(member: Token) -> RuntimeException:
+    return RuntimeException(f"Membro '{member.value}' não encontrado no objeto.", member)
+
+def compact_list_error(values: CompactList, token: Token, context='') -> RuntimeException:
+    return RuntimeException(f"Valor incompatível com uma lista compacta de {'inteiros de 64 bits' if values.typecode == 'q' else 'racionais'}{context}.", token)
+
+def store_token(node: ListAssignmentStatement) -> Token:
+    list_expr = node.list_access.list_expr
+    return list_expr.token if isinstance(list_expr, Value) else Token(TokenType.NONE, '', node.line, 0)
+
+def member_field(obj, member: Token):
+    field = type(obj).fields.get(member.value) if isinstance(obj, StructInstance) else None
+    if field is None: raise missing_member(member)
+    return field
 
 class ModuleInstance:
     def __init__(self, name: str, env: VariableBank):
@@ -33,9 +106,18 @@ class ModuleInstance:
     def __repr__(self): return f"<ModuleInstance {self.name}>"
 
 class Interpreter:
+    elide_scopes = True
+    optimize = True
+    compact_lists = False
+    max_call_depth = MAX_CALL_DEPTH
+
     def __init__(self):
         self.environment = VariableBank()
-        self.imported_modules = {}
+        self.modules = ModuleRegistry()
+        self.output = OutputSink()
+        self.input = InputSource()
+        self.call_depth = 0
+        self.eliminated_nodes = 0
 
     def visit(self, node):
         method_name = f'visit_{type(node).__name__}'
@@ -46,62 +128,101 @@ class Interpreter:
         raise Exception(f'Nenhum método visit_{type(node).__name__} encontrado para o nó {node}')
 
     def run(self, nodes, base_path='.'):
-        previous_path = getattr(self, 'base_path', '.')
+        previous_path, previous_limit = getattr(self, 'base_path', '.'), self._reserve_python_stack()
         self.base_path = base_path
-        
-        for node in nodes:
-            if isinstance(node, (FunctionDeclaration, StructDefinition, ImportStatement)):
-                self.visit(node)
-        
-        for node in nodes:
-            if not isinstance(node, (FunctionDeclaration, StructDefinition, ImportStatement)):
-                self.visit(node)
-        
-        self.base_path = previous_path
+        try:
+            Resolver(self.elide_scopes, self.environment).resolve(nodes)
+            
+            for node in nodes:
+                if isinstance(node, (FunctionDeclaration, StructDefinition, ImportStatement)):
+                    self.visit(node)
+            
+            for node in nodes:
+                if not isinstance(node, (FunctionDeclaration, StructDefinition, ImportStatement)):
+                    completion = self.visit(node)
+                    if completion is not None: raise ReturnSignal(ValueWrapper(completion.value, type_of(completion.value, completion.type)))
+        finally:
+            self.base_path = previous_path
+            sys.setrecursionlimit(previous_limit)
 
-    def execute_block(self, statements: list[Statement], environment: VariableBank):
+    def run_source(self, source: str | TextIO, base_path='.'):
+        try:
+            program, imports = self.load_source(source)
+            self.modules.preload(base_path, imports, self.create_module_interpreter)
+            self.run_program(program, base_path)
+        finally:
+            self.output.flush()
+
+    def load_source(self, source: str | TextIO) -> tuple[list[Statement], list[str]]:
+        parser = Parser(Lexer().stream(source), self.environment)
+        return self._optimize(parser.parse()), parser.imports
+
+    def run_program(self, program: list[Statement], base_path: str):
+        self.run(program, base_path)
+
+    def create_module_interpreter(self):
+        interpreter = type(self)()
+        interpreter.max_call_depth, interpreter.optimize, interpreter.elide_scopes, interpreter.modules = self.max_call_depth, self.optimize, self.elide_scopes, self.modules
+        interpreter.compact_lists = self.compact_lists
+        interpreter.output, interpreter.input = self.output, self.input
+        return interpreter
+
+    def _optimize(self, nodes: list[Statement]) -> list[Statement]:
+        if not self.optimize: return nodes
+        optimizer = Optimizer(self)
+        nodes = optimizer.optimize(nodes)
+        self.eliminated_nodes += optimizer.eliminated
+        return nodes
+
+    def _reserve_python_stack(self) -> int:
+        previous_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(previous_limit, self.max_call_depth * PYTHON_FRAMES_PER_CALL))
+        return previous_limit
+
+    def _stack_overflow(self, token: Token) -> RuntimeException:
+        return RuntimeException(f"Estouro da pilha de chamadas: limite de {self.max_call_depth} chamadas aninhadas excedido.", token)
+
+    def _element_type(self, iterable, static_type: Type | None, token: Token) -> Type:
+        iterable_type = type_of(iterable, static_type)
+        if not isinstance(iterable_type, (ListType, MapType, StringType, RangeType)): raise RuntimeException(f"Laço 'for' só pode iterar sobre listas, mapas, intervalos ou strings, não sobre o tipo '{iterable_type}'", token)
+        if isinstance(iterable_type, MapType): return iterable_type.key_type
+        if isinstance(iterable_type, RangeType): return INTEGER
+        return iterable_type.element_type if isinstance(iterable_type, ListType) else STRING
+
+    def execute_statements(self, statements: list[Statement]) -> ValueWrapper | None:
+        for statement in statements:
+            completion = self.visit(statement)
+            if completion is not None: return completion
+
+    def execute_block(self, statements: list[Statement], environment: VariableBank | Frame) -> ValueWrapper | None:
         previous_env = self.environment
         try:
             self.environment = environment
-            for statement in statements:
-                self.visit(statement)
+            return self.execute_statements(statements)
         finally:
             self.environment = previous_env
 
-    def _load_module(self, module_name_token: Token):
-        module_name = module_name_token.value
-        if module_name in self.imported_modules:
-            return self.imported_modules[module_name]
+    def execute_scoped(self, statements: list[Statement], scope: Scope) -> ValueWrapper | None:
+        if scope.elided: return self.execute_statements(statements)
+        return self.execute_block(statements, Frame(scope, self.environment))
 
-        module_file_name = module_name + '.prose'
-        module_path = os.path.join(self.base_path, module_file_name)
-        absolute_path = os.path.abspath(module_path)
-
-        try:
-            with open(absolute_path, 'r', encoding='utf-8') as file:
-                code = file.read()
-        except FileNotFoundError:
-            raise RuntimeException(f"Módulo '{module_name}' não encontrado.", module_name_token)
-
-        module_interpreter = Interpreter()
-        lexer = Lexer()
-        tokens = lexer.tokenize(code)
-        parser = Parser(tokens, module_interpreter.environment)
-        syntax_tree = parser.parse()
-        module_interpreter.run(syntax_tree, base_path=os.path.dirname(absolute_path))
-        
-        self.imported_modules[module_name] = module_interpreter.environment
-        return module_interpreter.environment
+    def _iteration_frame(self, scope: Scope, frame: Frame | None) -> Frame:
+        if frame is None or not scope.reusable: return Frame(scope, self.environment)
+        frame.reset()
+        return frame
 
     def visit_ImportStatement(self, node: ImportStatement):
-        module_env = self._load_module(node.module_path)
+        self._import(node, self.environment)
+
+    def _import(self, node: ImportStatement, environment: VariableBank | Frame):
+        module_env = self.modules.load(node.module_path, self.base_path, self)
         
         if node.imported_names:
-            for name_token in node.imported_names:
+            for i, name_token in enumerate(node.imported_names):
                 name = name_token.value
                 try:
                     variable = module_env.get(name)
-                    self.environment.create(name, variable.constant, variable.vartype, variable.value)
+                    self._bind(environment, node.bindings, i, name, Variable(variable.constant, variable.vartype, variable.value))
                 except Exception:
                     raise RuntimeException(f"Nome '{name}' não encontrado no módulo '{node.module_path.value}'.", name_token)
         else:
@@ -109,7 +230,11 @@ class Interpreter:
             module_object = ModuleInstance(module_name, module_env)
             for name, var in module_env.variables.items():
                 setattr(module_object, name, var.value)
-            self.environment.create(module_name, True, ModuleType(module_name), module_object)
+            self._bind(environment, node.bindings, 0, module_name, Variable(True, ModuleType(module_name), module_object))
+
+    def _bind(self, environment: VariableBank | Frame, bindings, index: int, name: str, variable: Variable):
+        if bindings is None: environment.create(name, variable.constant, variable.vartype, variable.value)
+        else: environment.declare(*bindings[index], variable)
 
     def visit_StructDefinition(self, node: StructDefinition):
         pass
@@ -120,221 +245,263 @@ class Interpreter:
         param_types = [p[0].to_type_object() for p in node.params]
         return_type = node.return_type_node.to_type_object()
         func_type = FunctionType(param_types, return_type)
-        self.environment.create(func_name, True, func_type, func_obj)
+        if node.symbol is None: self.environment.create(func_name, True, func_type, func_obj)
+        else: self.environment.declare(node.symbol, node.redeclaration, func_obj)
     
     def visit_CreateStatement(self, node: CreateStatement):
         var_type = node.type_node.to_type_object()
-        value = None
-        if node.expression:
-            value = self.visit(node.expression).value
-        elif isinstance(var_type, ListType):
-            value = []
-        elif isinstance(var_type, StructType):
-            value = StructInstance()
-            for field_name, field_type in var_type.fields.items():
-                default_val = None
-                if isinstance(field_type, (IntegerType, RationalType)): default_val = 0
-                if isinstance(field_type, StringType): default_val = ""
-                if isinstance(field_type, BooleanType): default_val = False
-                if isinstance(field_type, ListType): default_val = []
-                setattr(value, field_name, default_val)
-        self.environment.create(node.identifier.value, node.const_or_var.value == 'constant', var_type, value)
+        value = self.visit(node.expression) if node.expression else self._initial_value(var_type)
+        if node.symbol is None: self.environment.create(node.identifier.value, node.const_or_var.value == 'constant', var_type, value)
+        else: self.environment.declare(node.symbol, node.redeclaration, value)
+
+    def _initial_value(self, var_type: Type):
+        if isinstance(var_type, ListType): return self._empty_list(var_type.element_type)
+        if isinstance(var_type, MapType): return {}
+        if isinstance(var_type, BuilderType): return StringBuilder()
+        if isinstance(var_type, StructType):
+            runtime_class = struct_class(var_type)
+            value = runtime_class()
+            for field, field_type in zip(runtime_class.fields.values(), var_type.fields.values()): field.__set__(value, self._field_default(field_type))
+            return value
+        return None
+
+    def _field_default(self, field_type: Type):
+        if isinstance(field_type, (IntegerType, RationalType)): return 0
+        if isinstance(field_type, StringType): return ""
+        if isinstance(field_type, BooleanType): return False
+        if isinstance(field_type, ListType): return self._empty_list(field_type.element_type)
+        if isinstance(field_type, MapType): return {}
+        if isinstance(field_type, BuilderType): return StringBuilder()
+        return None
+
+    def _empty_list(self, element_type: Type | None):
+        typecode = COMPACT_TYPECODES.get(element_type) if self.compact_lists else None
+        return CompactList(typecode) if typecode else []
 
     def visit_SetStatement(self, node: SetStatement):
         var_name = node.identifier.value
-        value_wrapper = self.visit(node.expression)
-        self.environment.set(var_name, value_wrapper.value)
+        value = self.visit(node.expression)
+        if node.address is None: self.environment.globals.set(var_name, value)
+        else: self.environment.store(node.address, value)
 
     def visit_MemberAssignmentStatement(self, node: MemberAssignmentStatement):
-        obj_wrapper = self.visit(node.member_access.obj)
-        value_wrapper = self.visit(node.expression)
-        setattr(obj_wrapper.value, node.member_access.member.value, value_wrapper.value)
+        obj = self.visit(node.member_access.obj)
+        value = self.visit(node.expression)
+        field, member = node.member_access.field, node.member_access.member
+        if field is None: field = member_field(obj, member)
+        elif obj is None: raise missing_member(member)
+        field.__set__(obj, value)
 
     def visit_ListAssignmentStatement(self, node: ListAssignmentStatement):
-        list_wrapper = self.visit(node.list_access.list_expr)
-        index_wrapper = self.visit(node.list_access.index_expression)
-        value_wrapper = self.visit(node.expression)
-        list_wrapper.value[index_wrapper.value] = value_wrapper.value
+        target = self.visit(node.list_access.list_expr)
+        index = self.visit(node.list_access.index_expression)
+        value = self.visit(node.expression)
+        try:
+            target[index] = value
+        except (OverflowError, TypeError):
+            if isinstance(target, CompactList): raise compact_list_error(target, store_token(node))
+            raise
 
     def visit_ExpressionStatement(self, node: ExpressionStatement):
         self.visit(node.expression)
 
-    def visit_Value(self, node: Value) -> ValueWrapper:
-        token_type = node.token.token_type
-        value = node.token.value
-        if token_type == TokenType.INTEGER: return ValueWrapper(int(value), IntegerType())
-        if token_type == TokenType.RATIONAL: return ValueWrapper(float(value), RationalType())
-        if token_type == TokenType.STRING: return ValueWrapper(value[1:-1], StringType())
-        if token_type == TokenType.BOOLEAN: return ValueWrapper(value == 'true', BooleanType())
-        if token_type == TokenType.IDENTIFIER:
-            var = self.environment.get(value)
-            return ValueWrapper(var.value, var.vartype)
+    def visit_Constant(self, node: Constant):
+        return node.value
+
+    def visit_Value(self, node: Value):
+        if node.token.token_type != TokenType.IDENTIFIER: return literal_value(node.token)
+        if node.address is not None: return self.environment.load(node.address)
+        return self.environment.globals.get(node.token.value).value
             
-    def visit_BinOp(self, node: BinOp) -> ValueWrapper:
+    def visit_BinOp(self, node: BinOp):
         left = self.visit(node.left)
         right = self.visit(node.right)
-        op = node.op.token_type
+        operation = node.operation
+        if operation is None: operation = node.operation = binary_operation(node)
         try:
-            if op == TokenType.ADDITION:
-                if isinstance(left.type, StringType) or isinstance(right.type, StringType):
-                    return ValueWrapper(str(left.value) + str(right.value), StringType())
-                result = left.value + right.value
-            elif op == TokenType.SUBTRACTION: result = left.value - right.value
-            elif op == TokenType.MULTIPLICATION: result = left.value * right.value
-            elif op == TokenType.DIVISION: result = left.value / right.value
-            elif op == TokenType.MODULUS: result = left.value % right.value
-            elif op == TokenType.GREATER: result = left.value > right.value
-            elif op == TokenType.LESS: result = left.value < right.value
-            elif op == TokenType.GREATER_EQUAL: result = left.value >= right.value
-            elif op == TokenType.LESS_EQUAL: result = left.value <= right.value
-            elif op == TokenType.EQUAL: result = left.value == right.value
-            elif op == TokenType.NOT_EQUAL: result = left.value != right.value
-            elif op == TokenType.AND: result = left.value and right.value
-            elif op == TokenType.OR: result = left.value or right.value
-            else: raise Exception(f"Operador binário desconhecido: {op}")
-            result_type = BooleanType()
-            if op in {TokenType.ADDITION, TokenType.SUBTRACTION, TokenType.MULTIPLICATION, TokenType.DIVISION, TokenType.MODULUS}:
-                result_type = RationalType() if isinstance(left.type, RationalType) or isinstance(right.type, RationalType) else IntegerType()
-            return ValueWrapper(result, result_type)
+            return operation(left, right)
         except ZeroDivisionError:
             raise RuntimeException("Divisão por zero.", node.op)
         except TypeError:
-            raise RuntimeException(f"Operação inválida entre os tipos {left.type} e {right.type}.", node.op)
+            raise invalid_operation(node.op, left, right, node.left.static_type, node.right.static_type)
     
     def visit_IfStructure(self, node: IfStructure):
         for i, condition in enumerate(node.conditions):
-            if self.visit(condition).value:
-                self.execute_block(node.bodies[i], VariableBank(parent=self.environment))
-                return
+            if self.visit(condition):
+                return self.execute_scoped(node.bodies[i], node.scopes[i])
         if node.else_body:
-            self.execute_block(node.else_body, VariableBank(parent=self.environment))
+            return self.execute_scoped(node.else_body, node.else_scope)
 
     def visit_ForStructure(self, node: ForStructure):
-        iterable_wrapper = self.visit(node.iterable_expression)
-        iterable_value = iterable_wrapper.value
-        if not isinstance(iterable_wrapper.type, (ListType, StringType)): raise RuntimeException(f"Laço 'for' só pode iterar sobre listas ou strings, não sobre o tipo '{iterable_wrapper.type}'", node.loop_variable)
-        for item in iterable_value:
-            loop_env = VariableBank(parent=self.environment)
-            element_type = iterable_wrapper.type.element_type if isinstance(iterable_wrapper.type, ListType) else StringType()
-            loop_env.create(node.loop_variable.value, True, element_type, item)
-            self.execute_block(node.body, loop_env)
+        iterable_value = self.visit(node.iterable_expression)
+        element_type = INTEGER if type(iterable_value) is range else self._element_type(iterable_value, node.iterable_expression.static_type, node.loop_variable)
+        scope, slot = node.scope, node.symbol.slot
+        if scope.reusable: return self._reusable_loop(node.body, Frame(scope, self.environment), slot, Variable(True, element_type, None), loop_items(iterable_value))
+        for item in loop_items(iterable_value):
+            loop_env = Frame(scope, self.environment)
+            loop_env.slots[slot] = Variable(True, element_type, item)
+            completion = self.execute_block(node.body, loop_env)
+            if completion is not None: return completion
+
+    def _reusable_loop(self, statements: list[Statement], loop_env: Frame, slot: int, loop_variable: Variable, items):
+        previous_env, self.environment = self.environment, loop_env
+        slots, reset = loop_env.slots, loop_env.reset
+        try:
+            for item in items:
+                reset()
+                loop_variable.value = item
+                slots[slot] = loop_variable
+                completion = self.execute_statements(statements)
+                if completion is not None: return completion
+        finally:
+            self.environment = previous_env
 
     def visit_WhileStructure(self, node: WhileStructure):
-        while self.visit(node.condition).value:
-            self.execute_block(node.body, VariableBank(parent=self.environment))
+        if node.scope.elided:
+            while self.visit(node.condition):
+                completion = self.execute_statements(node.body)
+                if completion is not None: return completion
+            return
+        frame = None
+        while self.visit(node.condition):
+            frame = self._iteration_frame(node.scope, frame)
+            completion = self.execute_block(node.body, frame)
+            if completion is not None: return completion
 
     def visit_DoWhileStructure(self, node: DoWhileStructure):
+        if node.scope.elided:
+            while True:
+                completion = self.execute_statements(node.body)
+                if completion is not None: return completion
+                if not self.visit(node.condition): break
+            return
+        frame = None
         while True:
-            self.execute_block(node.body, VariableBank(parent=self.environment))
-            if not self.visit(node.condition).value: break
+            frame = self._iteration_frame(node.scope, frame)
+            completion = self.execute_block(node.body, frame)
+            if completion is not None: return completion
+            if not self.visit(node.condition): break
     
     def visit_FunctionCall(self, node: FunctionCall):
-        if isinstance(node.callee, Value) and self.environment.is_native_function(node.callee.token.value):
-            return self._visit_native_function_call(node)
-        
-        callee_wrapper = self.visit(node.callee)
-        func_obj = callee_wrapper.value
+        if node.native: return self._call_native(node.native, node.callee.token, [self.visit(arg) for arg in node.arguments])
+        return self._call_function(self._prepare_call(node))
+
+    def _prepare_call(self, node: FunctionCall) -> TailCall:
+        func_obj = self.visit(node.callee)
         
         if not isinstance(func_obj, ProseFunction):
-            raise RuntimeException(f"Expressão do tipo '{callee_wrapper.type}' não é chamável.", node.callee.token if isinstance(node.callee, Value) else Token(TokenType.NONE,'',0,0))
+            raise RuntimeException(f"Expressão do tipo '{type_of(func_obj, node.callee.static_type)}' não é chamável.", node.callee.token if isinstance(node.callee, Value) else Token(TokenType.NONE,'',0,0))
+
+        return TailCall(func_obj, [self.visit(arg) for arg in node.arguments], error_token(node.callee))
 
-        arg_values = [self.visit(arg).value for arg in node.arguments]
-        func_env = VariableBank(parent=func_obj.closure)
-        for i, param_node in enumerate(func_obj.declaration.params):
-            func_env.create(param_node[1].value, False, param_node[0].to_type_object(), arg_values[i])
-        return_value_wrapper = ValueWrapper(None, VoidType())
+    def _call_function(self, call: TailCall):
+        if self.call_depth >= self.max_call_depth: raise self._stack_overflow(call.token)
+        self.call_depth += 1
         try:
-            self.execute_block(func_obj.declaration.body, func_env)
-        except ReturnSignal as rs:
-            return_value_wrapper = rs.value_wrapper
-        return return_value_wrapper
-
-    def _visit_native_function_call(self, node: FunctionCall):
-        func_name = node.callee.token.value
-        arg_wrappers = [self.visit(arg) for arg in node.arguments]
-        if func_name == 'readme': return
-        if not arg_wrappers: raise RuntimeException(f"Função nativa '{func_name}' chamada sem argumentos.", node.callee.token)
-        
-        target_wrapper = arg_wrappers[0]
-        
+            while True:
+                declaration = call.function.declaration
+                func_env = call.function.closure if declaration.scope.elided else Frame(declaration.scope, call.function.closure)
+                for i, binding in enumerate(declaration.param_bindings):
+                    func_env.declare(*binding, call.arguments[i])
+                completion = self.execute_block(declaration.body, func_env)
+                if type(completion) is not TailCall: return None if completion is None else completion.value
+                call = completion
+        except RecursionError:
+            raise self._stack_overflow(call.token)
+        finally:
+            self.call_depth -= 1
+
+    def _call_native(self, native: NativeFunction, name_token: Token, arguments: list):
+        if not arguments and native.requires_arguments: raise RuntimeException(f"Função nativa '{native.name}' chamada sem argumentos.", name_token)
         try:
-            if func_name == 'add': target_wrapper.value.append(arg_wrappers[1].value); return ValueWrapper(None, VoidType())
-            if func_name == 'get': return ValueWrapper(target_wrapper.value[arg_wrappers[1].value], target_wrapper.type.element_type)
-            if func_name == 'remove': target_wrapper.value.pop(arg_wrappers[1].value); return ValueWrapper(None, VoidType())
-            if func_name == 'length': return ValueWrapper(len(target_wrapper.value), IntegerType())
-            if func_name == 'uppercase': return ValueWrapper(target_wrapper.value.upper(), StringType())
-            if func_name == 'lowercase': return ValueWrapper(target_wrapper.value.lower(), StringType())
-            if func_name == 'substring': return ValueWrapper(target_wrapper.value[arg_wrappers[1].value:arg_wrappers[2].value], StringType())
+            return native.implementation(self, arguments)
         except IndexError:
-            raise RuntimeException(f"Índice fora dos limites.", node.callee.token)
+            raise RuntimeException(f"Índice fora dos limites.", name_token)
+        except KeyError as e:
+            raise RuntimeException(f"Chave {e} não encontrada no mapa.", name_token)
+        except (OverflowError, TypeError) as e:
+            if arguments and isinstance(arguments[0], CompactList):
+                raise compact_list_error(arguments[0], name_token, f" em '{native.name}'")
+            raise RuntimeException(f"Erro ao executar função nativa '{native.name}': {e}", name_token)
         except Exception as e:
-            raise RuntimeException(f"Erro ao executar função nativa '{func_name}': {e}", node.callee.token)
+            raise RuntimeException(f"Erro ao executar função nativa '{native.name}': {e}", name_token)
 
     def visit_ReturnStatement(self, node: ReturnStatement):
-        value_wrapper = self.visit(node.expression) if node.expression else ValueWrapper(None, VoidType())
-        raise ReturnSignal(value_wrapper)
+        if node.tail_call: return self._prepare_call(node.expression)
+        if node.expression is None: return ValueWrapper(None, VOID)
+        return ValueWrapper(self.visit(node.expression), node.expression.static_type)
             
     def visit_WriteLnStatement(self, node: WriteLnStatement):
-        value_wrapper = self.visit(node.expression)
-        if isinstance(value_wrapper.value, StructInstance): print(f"<Objeto {value_wrapper.type.name}>")
-        else: print(value_wrapper.value)
+        self._write(self.visit(node.expression), node.expression.static_type, '\n')
 
     def visit_WriteStatement(self, node: WriteStatement):
-        value_wrapper = self.visit(node.expression)
-        if isinstance(value_wrapper.value, StructInstance): print(f"<Objeto {value_wrapper.type.name}>", end='')
-        else: print(value_wrapper.value, end='')
+        self._write(self.visit(node.expression), node.expression.static_type, '')
+
+    def _write(self, value, static_type: Type | None, end: str):
+        if isinstance(value, StructInstance): value = f"<Objeto {type_of(value, static_type).name}>"
+        self.output.write(f"{value}{end}")
+
+    def _read_line(self, token: Token, prompt='') -> str:
+        if prompt != '': self.output.write(str(prompt))
+        self.output.flush()
+        try: return self.input.read_line()
+        except EOFError: raise RuntimeException(f"Fim da entrada ao ler a variável '{token.value}'.", token)
     
     def visit_ReadStatement(self, node: ReadStatement):
-        var = self.environment.get(node.identifier.value)
-        user_input = input()
-        try:
-            if isinstance(var.vartype, IntegerType): var.value = int(user_input)
-            elif isinstance(var.vartype, RationalType): var.value = float(user_input)
-            elif isinstance(var.vartype, BooleanType): var.value = user_input.lower() == 'true'
-            else: var.value = user_input
-        except ValueError: raise RuntimeException(f"Entrada inválida. Esperava um valor do tipo {var.vartype}.", node.identifier)
+        var_type = self._input_type(self.environment, node.address, node.identifier)
+        self._store_input(self.environment, node.address, var_type, self._read_line(node.identifier), node.identifier)
     
     def visit_ReadmeStatement(self, node: ReadmeStatement):
-        prompt_wrapper = self.visit(node.prompt_expression)
-        user_input = input(prompt_wrapper.value)
-        var = self.environment.get(node.target_variable.value)
+        user_input = self._read_line(node.target_variable, self.visit(node.prompt_expression))
+        var_type = self._input_type(self.environment, node.address, node.target_variable)
+        self._store_input(self.environment, node.address, var_type, user_input, node.target_variable)
+
+    def _input_type(self, environment: VariableBank | Frame, address: Address | None, token: Token) -> Type:
+        return environment.globals.get(token.value).vartype if address is None else environment.load_type(address)
+
+    def _store_input(self, environment: VariableBank | Frame, address: Address | None, var_type: Type, user_input: str, token: Token):
         try:
-            if isinstance(var.vartype, IntegerType): var.value = int(user_input)
-            elif isinstance(var.vartype, RationalType): var.value = float(user_input)
-            elif isinstance(var.vartype, BooleanType): var.value = user_input.lower() == 'true'
-            else: var.value = user_input
-        except ValueError: raise RuntimeException(f"Entrada inválida. Esperava um valor do tipo {var.vartype}.", node.target_variable)
-
-    def visit_ListLiteral(self, node: ListLiteral) -> ValueWrapper:
-        elements = [self.visit(elem).value for elem in node.elements]
-        return ValueWrapper(elements, node.get_type(self.environment))
-
-    def visit_ListAccess(self, node: ListAccess) -> ValueWrapper:
-        list_wrapper = self.visit(node.list_expr)
-        index_wrapper = self.visit(node.index_expression)
+            if isinstance(var_type, IntegerType): value = int(user_input)
+            elif isinstance(var_type, RationalType): value = float(user_input)
+            elif isinstance(var_type, BooleanType): value = user_input.lower() == 'true'
+            else: value = user_input
+        except ValueError: raise RuntimeException(f"Entrada inválida. Esperava um valor do tipo {var_type}.", token)
+        if address is None: environment.globals.get(token.value).value = value
+        else: environment.store(address, value, force=True)
+
+    def visit_ListLiteral(self, node: ListLiteral) -> list:
+        return [self.visit(elem) for elem in node.elements]
+
+    def visit_MapLiteral(self, node: MapLiteral) -> dict:
+        return {self.visit(key): self.visit(value) for key, value in zip(node.keys, node.values)}
+
+    def visit_ListAccess(self, node: ListAccess):
+        target = self.visit(node.list_expr)
+        index = self.visit(node.index_expression)
         try:
-            return ValueWrapper(list_wrapper.value[index_wrapper.value], list_wrapper.type.element_type)
+            return target[index]
         except IndexError:
-            raise RuntimeException(f"Índice {index_wrapper.value} fora dos limites da lista.", node.list_expr.token if isinstance(node.list_expr, Value) else Token(TokenType.NONE, '', 0, 0))
-
-    def visit_MemberAccess(self, node: MemberAccess) -> ValueWrapper:
-        obj_wrapper = self.visit(node.obj)
-        member_name = node.member.value
-        obj_value = obj_wrapper.value
+            raise RuntimeException(f"Índice {index} fora dos limites da lista.", node.list_expr.token if isinstance(node.list_expr, Value) else Token(TokenType.NONE, '', 0, 0))
+        except KeyError:
+            raise RuntimeException(f"Chave {index!r} não encontrada no mapa.", node.list_expr.token if isinstance(node.list_expr, Value) else Token(TokenType.NONE, '', 0, 0))
+
+    def visit_MemberAccess(self, node: MemberAccess):
+        obj = self.visit(node.obj)
+        if node.field is None: return self._access_member(obj, node.obj.static_type, node.member)
+        if obj is None: raise missing_member(node.member)
+        return node.field.__get__(obj)
+
+    def _access_member(self, obj_value, static_type: Type | None, member: Token):
+        member_name = member.value
         
         if isinstance(obj_value, ModuleInstance):
             try:
                 member_var = obj_value.environment.get(member_name)
-                return ValueWrapper(member_var.value, member_var.vartype)
+                return member_var.value
             except Exception:
-                raise RuntimeException(f"O módulo '{obj_value.name}' não possui um membro chamado '{member_name}'", node.member)
-        if isinstance(obj_wrapper.type, StructType):
-            try:
-                field_value = getattr(obj_value, member_name)
-                field_type = obj_wrapper.type.fields[member_name]
-                return ValueWrapper(field_value, field_type)
-            except AttributeError:
-                raise RuntimeException(f"Membro '{member_name}' não encontrado no objeto.", node.member)
-        if isinstance(obj_wrapper.type, ListType) and member_name == 'length':
-            return ValueWrapper(len(obj_value), IntegerType())
-        raise RuntimeException("Acesso a membro inválido.", node.member)
+                raise RuntimeException(f"O módulo '{obj_value.name}' não possui um membro chamado '{member_name}'", member)
+        obj_type = type_of(obj_value, static_type)
+        if isinstance(obj_type, StructType): return member_field(obj_value, member).__get__(obj_value)
+        if isinstance(obj_type, ListType) and member_name == 'length':
+            return len(obj_value)
+        raise RuntimeException("Acesso a membro inválido.", member)
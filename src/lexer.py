@@ -1,4 +1,5 @@
 import re
+import sys
 from util.token import Token, TokenType
 
 token_regex = {
@@ -48,6 +49,8 @@ token_regex = {
     TokenType.RPAREN:         re.compile(r'\)'),
     TokenType.LBRACKET:       re.compile(r'\['),
     TokenType.RBRACKET:       re.compile(r'\]'),
+    TokenType.LBRACE:         re.compile(r'\{'),
+    TokenType.RBRACE:         re.compile(r'\}'),
     TokenType.SEMICOLON:      re.compile(r';'),
     TokenType.COMMA:          re.compile(r','),
     TokenType.COLON:          re.compile(r':'),
@@ -55,6 +58,28 @@ token_regex = {
     TokenType.IDENTIFIER:     re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*'),
 }
 
+KEYWORDS = {
+    'true': TokenType.BOOLEAN, 'false': TokenType.BOOLEAN,
+    'type': TokenType.TYPE_KEYWORD,
+    'string': TokenType.TYPE, 'integer': TokenType.TYPE, 'rational': TokenType.TYPE, 'boolean': TokenType.TYPE, 'list': TokenType.TYPE, 'void': TokenType.TYPE,
+    'constant': TokenType.VARTYPE, 'variable': TokenType.VARTYPE,
+    'create': TokenType.CREATE, 'do': TokenType.DO, 'else': TokenType.ELSE, 'elif': TokenType.ELIF, 'end': TokenType.END,
+    'for': TokenType.FOR, 'from': TokenType.FROM, 'function': TokenType.FUNCTION, 'if': TokenType.IF, 'import': TokenType.IMPORT,
+    'in': TokenType.IN, 'read': TokenType.READ, 'return': TokenType.RETURN, 'set': TokenType.SET, 'then': TokenType.THEN,
+    'to': TokenType.TO, 'while': TokenType.WHILE, 'write': TokenType.WRITE, 'writeln': TokenType.WRITELN,
+}
+
+MASTER_ORDER = [TokenType.SKIP, TokenType.RATIONAL, TokenType.INTEGER, TokenType.STRING] + [
+    token_type for token_type in token_regex
+    if token_type not in KEYWORDS.values() and token_type not in {TokenType.SKIP, TokenType.RATIONAL, TokenType.INTEGER, TokenType.STRING}
+]
+
+master_regex = re.compile('|'.join(
+    [r'(?P<NEWLINE>\n)'] + [f'(?P<{token_type.name}>{token_regex[token_type].pattern})' for token_type in MASTER_ORDER]
+))
+word_char_regex = re.compile(r'\w')
+group_types = {token_type.name: token_type for token_type in MASTER_ORDER}
+
 class Lexer:
     def __init__(self):
         self.text = ""
@@ -62,29 +87,46 @@ class Lexer:
         self.line = 1
         self.column = 1
     def tokenize(self, text):
-        self.text = text
+        return list(self.stream(text))
+    def stream(self, source):
+        self.text = source if isinstance(source, str) else ""
         self.pos = 0
         self.line = 1
         self.column = 1
-        tokens = []
-        while self.pos < len(self.text):
-            if self.text[self.pos] == '\n':
-                self.line += 1
-                self.column = 1
-                self.pos += 1
+        chunks = iter((source,)) if isinstance(source, str) else iter(source.readline, '')
+        match_at = master_regex.match
+        keywords = KEYWORDS
+        intern = sys.intern
+        buffer, base, pos, exhausted = "", 0, 0, False
+        line, line_start = 1, 0
+        while True:
+            match = match_at(buffer, pos) if pos < len(buffer) else None
+            if not exhausted and (match is None and (pos >= len(buffer) or buffer[pos] == '"') or match is not None and match.end() == len(buffer)):
+                chunk = next(chunks, None)
+                if chunk is None: exhausted = True
+                else:
+                    keep = pos - 1 if pos else 0
+                    buffer = buffer[keep:] + chunk
+                    base += keep
+                    pos -= keep
                 continue
-            matched = False
-            for token_type, regex in token_regex.items():
-                match = regex.match(self.text, self.pos)
-                if match:
-                    lexeme = match.group(0)
-                    if token_type != TokenType.SKIP:
-                        tokens.append(Token(token_type, lexeme, self.line, self.column))
-                    self.pos += len(lexeme)
-                    self.column += len(lexeme)
-                    matched = True
-                    break
-            if not matched:
-                raise Exception(f"Caractere inválido na linha {self.line}, coluna {self.column}: {self.text[self.pos]}")
-        tokens.append(Token(TokenType.EOF, "", self.line, self.column))
-        return tokens
\ No newline at end of file
+            if match is None:
+                if pos >= len(buffer): break
+                self.pos, self.line, self.column = base + pos, line, base + pos - line_start + 1
+                raise Exception(f"Caractere inválido na linha {self.line}, coluna {self.column}: {buffer[pos]}")
+            kind = match.lastgroup
+            end = match.end()
+            if kind == 'NEWLINE':
+                line += 1
+                line_start = base + end
+            elif kind == 'IDENTIFIER':
+                lexeme = intern(match.group())
+                token_type = keywords.get(lexeme, TokenType.IDENTIFIER)
+                if token_type is not TokenType.IDENTIFIER and pos and word_char_regex.match(buffer, pos - 1):
+                    token_type = TokenType.IDENTIFIER
+                yield Token(token_type, lexeme, line, base + pos - line_start + 1)
+            elif kind != 'SKIP':
+                yield Token(group_types[kind], intern(match.group()), line, base + pos - line_start + 1)
+            pos = end
+        self.pos, self.line, self.column = base + pos, line, base + pos - line_start + 1
+        yield Token(TokenType.EOF, "", self.line, self.column)
@@ -1,44 +1,64 @@
 import os
 import sys
-from util.token import TokenType
-from lexer import Lexer
-from parsa import Parser
+from typing import TextIO
 from prose_ast import ParseException, RuntimeException
-from interpreter import Interpreter
+from interpreter import Interpreter, MAX_CALL_DEPTH
+from closure_compiler import CompiledInterpreter
+from vm import VirtualMachine
+from output import OutputSink, DEFAULT_BUFFER_SIZE
+from profiler import Profiler, PROFILED_ENGINES
 
 EXTENSION = "prose"
 VERSION = "2.0.0"
+ENGINES = {"tree": Interpreter, "compiled": CompiledInterpreter, "vm": VirtualMachine}
 USAGE = f"""Uso:
-  prose <arquivo.prose>   (para executar um arquivo)
-  prose                   (para iniciar o modo interativo - REPL)"""
+  prose [opções] <arquivo.prose>   (para executar um arquivo)
+  prose [opções]                   (para iniciar o modo interativo - REPL)
 
-def run(code: str, interpreter: Interpreter, base_path: str):
-    try:
-        lexer = Lexer()
-        tokens = lexer.tokenize(code)
-        
-        parser = Parser(tokens, interpreter.environment)
-        syntax_tree = parser.parse()
-
-        interpreter.run(syntax_tree, base_path)
+Opções:
+  --engine=<{'|'.join(ENGINES)}>   motor de execução (padrão: tree)
+  --max-depth=<n>               profundidade máxima da pilha de chamadas (padrão: {MAX_CALL_DEPTH})
+  --no-optimize                 desativa o otimizador da AST
+  --optimizer-stats             mostra quantos nós o otimizador eliminou
+  --output-buffer=<bytes>       tamanho do buffer de saída; 0 desativa (padrão: {DEFAULT_BUFFER_SIZE})
+  --compact-lists               armazena list<integer> e list<rational> vazias em memória contígua
+  --profile[=<arquivo>]         mede chamadas e tempo por função e por linha; grava as pilhas no
+                                formato collapsed para flame graphs (padrão: <programa>.folded)"""
 
+def run(source: str | TextIO, interpreter: Interpreter, base_path: str):
+    try:
+        interpreter.run_source(source, base_path)
     except (ParseException, RuntimeException) as e:
         print(e)
     except Exception as e:
         print(f"Erro inesperado: {e}")
 
-def run_file(file_path: str):
-    interpreter = Interpreter()
+def create_interpreter(engine: str, max_depth: int = MAX_CALL_DEPTH, optimize: bool = True, buffer_size: int = DEFAULT_BUFFER_SIZE, compact_lists: bool = False, profiler: Profiler | None = None) -> Interpreter:
+    interpreter = ENGINES[engine]() if profiler is None else PROFILED_ENGINES[engine]()
+    interpreter.max_call_depth, interpreter.optimize, interpreter.output = max_depth, optimize, OutputSink(buffer_size=buffer_size)
+    interpreter.compact_lists = compact_lists
+    if profiler is not None: interpreter.profiler = profiler
+    return interpreter
+
+def write_profile(profiler: Profiler, path: str):
+    profiler.finish()
+    profiler.report(sys.stderr)
+    try:
+        with open(path, 'w', encoding='utf-8') as file:
+            profiler.write_collapsed(file)
+        print(f"Pilhas gravadas em '{path}'", file=sys.stderr)
+    except OSError as e:
+        print(f"Erro: não foi possível gravar o perfil em '{path}': {e}", file=sys.stderr)
+
+def run_file(file_path: str, interpreter: Interpreter):
     base_path = os.path.dirname(os.path.abspath(file_path))
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
-            code = file.read()
-        run(code, interpreter, base_path)
+            run(file, interpreter, base_path)
     except FileNotFoundError:
         print(f"Erro: Arquivo não encontrado em '{file_path}'")
 
-def run_prompt():
-    interpreter = Interpreter()
+def run_prompt(interpreter: Interpreter):
     base_path = os.getcwd()
     print(f"Prose Lang v{VERSION}")
     
@@ -51,10 +71,29 @@ def run_prompt():
             break
 
 def main():
-    if len(sys.argv) > 1:
-        run_file(sys.argv[1])
+    engine, max_depth, optimize, stats, buffer_size, compact_lists, profile, files = "tree", MAX_CALL_DEPTH, True, False, DEFAULT_BUFFER_SIZE, False, None, []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--engine="): engine = arg.split("=", 1)[1]
+        elif arg == "--no-optimize": optimize = False
+        elif arg == "--optimizer-stats": stats = True
+        elif arg == "--compact-lists": compact_lists = True
+        elif arg == "--profile": profile = ""
+        elif arg.startswith("--profile="): profile = arg.split("=", 1)[1]
+        elif arg.startswith("--max-depth=") and arg.split("=", 1)[1].isdigit(): max_depth = max(1, int(arg.split("=", 1)[1]))
+        elif arg.startswith("--output-buffer=") and arg.split("=", 1)[1].isdigit(): buffer_size = int(arg.split("=", 1)[1])
+        elif arg.startswith("-"): print(USAGE); return
+        else: files.append(arg)
+    if engine not in ENGINES:
+        print(f"Erro: motor de execução desconhecido '{engine}'\n{USAGE}")
+        return
+    profiler = None if profile is None else Profiler(os.path.basename(files[0]) if files else '<stdin>')
+    interpreter = create_interpreter(engine, max_depth, optimize, buffer_size, compact_lists, profiler)
+    if files:
+        run_file(files[0], interpreter)
     else:
-        run_prompt()
+        run_prompt(interpreter)
+    if profiler is not None: write_profile(profiler, profile or os.path.splitext(os.path.basename(files[0]) if files else 'prose')[0] + '.folded')
+    if stats: print(f"Otimizador: {interpreter.eliminated_nodes} nós eliminados", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
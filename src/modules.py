@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable
+from util.token import Token
+from prose_ast import RuntimeException
+from render import VariableBank
+
+MODULE_EXTENSION = '.prose'
+
+def module_path(base_path: str, name: str) -> str:
+    return os.path.abspath(os.path.join(base_path, name + MODULE_EXTENSION))
+
+def module_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+class Module:
+    def __init__(self, path: str, interpreter=None, program=None, imports: list[str] | None = None, error: Exception | None = None):
+        self.path = path
+        self.interpreter = interpreter
+        self.program = program
+        self.imports = imports or []
+        self.error = error
+        self.environment: VariableBank | None = None
+
+class ModuleRegistry:
+    def __init__(self, workers: int | None = None):
+        self.modules: dict[str, Module] = {}
+        self.loading: list[str] = []
+        self.workers = workers
+
+    def preload(self, base_path: str, names: list[str], create_interpreter: Callable):
+        if not names: return
+        pending = {}
+        with ThreadPoolExecutor(self.workers) as pool:
+            def discover(base_path: str, names: list[str]):
+                for name in names:
+                    path = module_path(base_path, name)
+                    if path not in self.modules and path not in pending: pending[path] = pool.submit(self._parse, path, create_interpreter)
+            discover(base_path, names)
+            while pending:
+                done, _ = wait(pending.values(), return_when=FIRST_COMPLETED)
+                for path, future in list(pending.items()):
+                    if future not in done: continue
+                    module = self.modules[path] = future.result()
+                    del pending[path]
+                    discover(os.path.dirname(path), module.imports)
+
+    def _parse(self, path: str, create_interpreter: Callable) -> Module:
+        interpreter = create_interpreter()
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                program, imports = interpreter.load_source(file)
+        except FileNotFoundError:
+            return Module(path)
+        except Exception as error:
+            return Module(path, interpreter, error=error)
+        return Module(path, interpreter, program, imports)
+
+    def load(self, token: Token, base_path: str, importer) -> VariableBank:
+        path = module_path(base_path, token.value)
+        if path not in self.modules: self.preload(base_path, [token.value], importer.create_module_interpreter)
+        module = self.modules[path]
+        if module.environment is not None: return module.environment
+        if path in self.loading:
+            cycle = self.loading[self.loading.index(path):] + [path]
+            raise RuntimeException(f"Importação circular detectada: {' -> '.join(map(module_name, cycle))}.", token)
+        if module.interpreter is None: raise RuntimeException(f"Módulo '{token.value}' não encontrado.", token)
+        if module.error is not None: raise module.error
+        self.loading.append(path)
+        try:
+            module.interpreter.run_program(module.program, os.path.dirname(path))
+        finally:
+            self.loading.pop()
+        importer.eliminated_nodes += module.interpreter.eliminated_nodes
+        module.environment = module.interpreter.environment
+        return module.environment
@@ -0,0 +1,69 @@
+from dataclasses import fields
+from prose_ast import *
+from resolver import binop_type
+
+def count_nodes(node) -> int:
+    if isinstance(node, list): return sum(count_nodes(item) for item in node)
+    if not isinstance(node, (Expression, Statement)): return 0
+    return 1 + sum(count_nodes(getattr(node, item.name)) for item in fields(node) if item.repr)
+
+class Optimizer:
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        self.eliminated = 0
+
+    def optimize(self, nodes: list[Statement]) -> list[Statement]:
+        before = count_nodes(nodes)
+        nodes = self._statements(nodes, top_level=True)
+        self.eliminated += before - count_nodes(nodes)
+        return nodes
+
+    def _statements(self, statements: list[Statement], top_level=False) -> list[Statement]:
+        optimized = []
+        for statement in statements:
+            statement = self.optimize_node(statement)
+            if statement is None: continue
+            optimized.append(statement)
+            if isinstance(statement, ReturnStatement) and not top_level: break
+        return optimized
+
+    def optimize_node(self, node):
+        method = getattr(self, f'optimize_{type(node).__name__}', None)
+        return method(node) if method else self._children(node)
+
+    def _children(self, node):
+        for item in fields(node):
+            value = getattr(node, item.name)
+            if isinstance(value, Expression): setattr(node, item.name, self.optimize_node(value))
+            elif isinstance(value, list) and value and isinstance(value[0], Expression): setattr(node, item.name, [self.optimize_node(element) for element in value])
+            elif isinstance(value, list) and value and isinstance(value[0], Statement): setattr(node, item.name, self._statements(value))
+        return node
+
+    def optimize_Value(self, node: Value) -> Value:
+        if node.token.token_type == TokenType.IDENTIFIER: return node
+        return Constant(node.token, value=self.evaluator.visit(node), var_type=node.get_type(None))
+
+    def optimize_BinOp(self, node: BinOp) -> Expression:
+        node.left, node.right = self.optimize_node(node.left), self.optimize_node(node.right)
+        if not (isinstance(node.left, Constant) and isinstance(node.right, Constant)): return node
+        try: value = self.evaluator.visit(node)
+        except Exception: return node
+        return Constant(node.op, value=value, var_type=binop_type(node.op.token_type, node.left.var_type, node.right.var_type))
+
+    def optimize_IfStructure(self, node: IfStructure) -> IfStructure | None:
+        conditions, bodies, else_body = [], [], node.else_body
+        for condition, body in zip(node.conditions, node.bodies):
+            condition = self.optimize_node(condition)
+            if not isinstance(condition, Constant):
+                conditions.append(condition); bodies.append(self._statements(body))
+            elif condition.value:
+                else_body = body
+                break
+        node.conditions, node.bodies, node.else_body = conditions, bodies, self._statements(else_body) if else_body else else_body
+        return node if conditions or node.else_body else None
+
+    def optimize_WhileStructure(self, node: WhileStructure) -> WhileStructure | None:
+        node.condition = self.optimize_node(node.condition)
+        if isinstance(node.condition, Constant) and not node.condition.value: return None
+        node.body = self._statements(node.body)
+        return node
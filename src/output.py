@@ -0,0 +1,29 @@
+import sys
+from typing import TextIO
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+class OutputSink:
+    def __init__(self, stream: TextIO | None = None, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.chunks: list[str] = []
+        self.size = 0
+
+    def write(self, text: str):
+        self.chunks.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size: self.flush()
+
+    def flush(self):
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self.chunks:
+            stream.write(''.join(self.chunks))
+            self.chunks.clear()
+            self.size = 0
+        stream.flush()
+
+    def getvalue(self) -> str:
+        if not hasattr(self.stream, 'getvalue'): raise TypeError("getvalue exige uma saída em memória, como io.StringIO; esta saída escreve direto no stream")
+        self.flush()
+        return self.stream.getvalue()
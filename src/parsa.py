@@ -1,16 +1,18 @@
-from util.token import Token, TokenType
+from typing import Iterable
+from util.token import Token, TokenType, TokenStream
 from render import VariableBank
 from prose_ast import *
 
 class Parser:
-    def __init__(self, tokens: list[Token], varbank: VariableBank = None): 
-        self.tokens, self.pos = tokens, 0
+    def __init__(self, tokens: Iterable[Token], varbank: VariableBank = None): 
+        self.tokens = tokens if isinstance(tokens, TokenStream) else TokenStream(tokens)
         self.varbank = varbank if varbank is not None else VariableBank()
+        self.imports: list[str] = []
     
     @property
-    def current_token(self) -> Token: return self.tokens[self.pos]
+    def current_token(self) -> Token: return self.tokens.current
     
-    def advance(self): self.pos += 1
+    def advance(self): self.tokens.advance()
     
     def consume(self, expected_type: TokenType):
         token = self.current_token
@@ -22,18 +24,24 @@ class Parser:
     def parse(self) -> list[Statement]:
         statements = []
         while self.current_token.token_type != TokenType.EOF:
-            statements.append(self._parse_toplevel_statement())
+            statements.append(self._located(self._parse_toplevel_statement))
         return statements
+
+    def _located(self, parse) -> Statement:
+        line = self.current_token.line
+        statement = parse()
+        statement.line = line
+        return statement
     
     def _parse_toplevel_statement(self) -> Statement:
-        if self.current_token.token_type == TokenType.CREATE and self.pos + 1 < len(self.tokens) and self.tokens[self.pos+1].token_type == TokenType.TYPE_KEYWORD:
+        if self.current_token.token_type == TokenType.CREATE and self.tokens.peek().token_type == TokenType.TYPE_KEYWORD:
             return self._parse_struct_definition()
         return self._parse_statement()
 
     def _parse_block(self) -> list[Statement]:
         statements = []; terminators = {TokenType.END, TokenType.ELSE, TokenType.ELIF, TokenType.WHILE, TokenType.EOF}
         while self.current_token.token_type not in terminators: 
-            statements.append(self._parse_statement())
+            statements.append(self._located(self._parse_statement))
         return statements
 
     def _parse_statement(self) -> Statement:
@@ -48,7 +56,7 @@ class Parser:
         stmt = None
         if token_type in (TokenType.IMPORT, TokenType.FROM):
             stmt = self._parse_import_statement()
-        elif token_type == TokenType.IDENTIFIER and self.current_token.value == 'readme' and self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].token_type == TokenType.IDENTIFIER:
+        elif token_type == TokenType.IDENTIFIER and self.current_token.value == 'readme' and self.tokens.peek().token_type == TokenType.IDENTIFIER:
             stmt = self._parse_readme_statement()
         elif token_type == TokenType.CREATE: stmt = self._parse_create_statement()
         elif token_type == TokenType.SET: stmt = self._parse_set_statement()
@@ -65,10 +73,12 @@ class Parser:
         if self.current_token.token_type == TokenType.IMPORT:
             self.consume(TokenType.IMPORT)
             module_name = self.consume(TokenType.IDENTIFIER)
+            self.imports.append(module_name.value)
             return ImportStatement(module_name)
         
         self.consume(TokenType.FROM)
         module_name = self.consume(TokenType.IDENTIFIER)
+        self.imports.append(module_name.value)
         self.consume(TokenType.IMPORT)
         
         names = [self.consume(TokenType.IDENTIFIER)]
@@ -86,6 +96,12 @@ class Parser:
             self.consume(TokenType.TYPE)
             self.consume(TokenType.LESS); element_type = self._parse_type(); self.consume(TokenType.GREATER)
             return ListTypeNode(element_type)
+        if type_token.token_type == TokenType.IDENTIFIER and type_token.value == 'map' and self.tokens.peek().token_type == TokenType.LESS:
+            self.advance(); self.consume(TokenType.LESS)
+            key_token = self.current_token; key_type = self._parse_type()
+            if not (isinstance(key_type, SimpleTypeNode) and key_type.type_token.value in MAP_KEY_TYPES): raise ParseException(f"Tipo de chave inválido para map: '{key_type}'. Use {', '.join(MAP_KEY_TYPES)}", key_token)
+            self.consume(TokenType.COMMA); value_type = self._parse_type(); self.consume(TokenType.GREATER)
+            return MapTypeNode(key_type, value_type)
         if type_token.token_type not in {TokenType.TYPE, TokenType.IDENTIFIER}: raise ParseException("Esperava um nome de tipo", type_token)
         self.advance()
         return SimpleTypeNode(type_token, self.varbank)
@@ -180,7 +196,7 @@ class Parser:
 
     def _parse_expression(self, precedence=0):
         left_expr = self._parse_primary_expression()
-        while self.pos < len(self.tokens):
+        while True:
             op_token = self.current_token
             if op_token.token_type == TokenType.LPAREN:
                 left_expr = self._parse_call_expression(left_expr)
@@ -208,6 +224,7 @@ class Parser:
         if token.token_type in LITERAL_AND_IDENTIFIER_TOKENS: self.advance(); return Value(token)
         if token.token_type == TokenType.LPAREN: self.consume(TokenType.LPAREN); expr = self._parse_expression(); self.consume(TokenType.RPAREN); return expr
         if token.token_type == TokenType.LBRACKET: return self._parse_list_literal()
+        if token.token_type == TokenType.LBRACE: return self._parse_map_literal()
         raise ParseException("Expressão primária inválida", token)
 
     def _parse_list_literal(self) -> ListLiteral:
@@ -217,6 +234,14 @@ class Parser:
             while self.current_token.token_type == TokenType.COMMA: self.consume(TokenType.COMMA); elements.append(self._parse_expression())
         self.consume(TokenType.RBRACKET); return ListLiteral(elements)
 
+    def _parse_map_literal(self) -> MapLiteral:
+        self.consume(TokenType.LBRACE); keys, values = [], []
+        if self.current_token.token_type != TokenType.RBRACE:
+            keys.append(self._parse_expression()); self.consume(TokenType.COLON); values.append(self._parse_expression())
+            while self.current_token.token_type == TokenType.COMMA:
+                self.consume(TokenType.COMMA); keys.append(self._parse_expression()); self.consume(TokenType.COLON); values.append(self._parse_expression())
+        self.consume(TokenType.RBRACE); return MapLiteral(keys, values)
+
     def _parse_call_expression(self, callee: Expression) -> FunctionCall:
         self.consume(TokenType.LPAREN); arguments = []
         if self.current_token.token_type != TokenType.RPAREN:
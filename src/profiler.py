@@ -0,0 +1,161 @@
+import os
+import time
+from collections import defaultdict
+from dataclasses import fields
+from typing import TextIO
+from prose_ast import Statement, FunctionDeclaration, ReturnStatement, FunctionCall
+from interpreter import Interpreter, TailCall
+from closure_compiler import ClosureCompiler, CompiledInterpreter
+from vm import VirtualMachine
+from bytecode import BytecodeCompiler
+
+ROOT = '<programa>'
+LINE_LIMIT = 20
+
+def nested_blocks(statement: Statement):
+    for item in fields(statement):
+        value = getattr(statement, item.name)
+        if not isinstance(value, list) or not value: continue
+        if isinstance(value[0], Statement): yield value
+        elif isinstance(value[0], list): yield from value
+
+def locate(statements: list[Statement], source: str) -> list[Statement]:
+    for statement in statements:
+        statement.location = (source, statement.line)
+        for block in nested_blocks(statement): locate(block, source)
+    return statements
+
+def function_key(declaration: FunctionDeclaration) -> tuple[str, str, int]:
+    return (declaration.name.value, *declaration.location)
+
+def source_name(source: str | TextIO) -> str:
+    return os.path.basename(source.name) if hasattr(source, 'name') else '<stdin>'
+
+def describe(key: tuple[str, str, int]) -> str:
+    name, source, line = key
+    return f"{name} ({source}:{line})" if line else f"{name} ({source})"
+
+class Profiler:
+    def __init__(self, source: str, clock=time.perf_counter):
+        self.clock = clock
+        self.functions: dict[tuple, list] = defaultdict(lambda: [0, 0.0, 0.0])
+        self.lines: dict[tuple, list] = defaultdict(lambda: [0, 0.0])
+        self.stacks: dict[tuple, float] = defaultdict(float)
+        self.active: dict[tuple, int] = defaultdict(int)
+        self.calls: list[list] = []
+        self.current_line: tuple[str, int] | None = None
+        self.mark = clock()
+        self.enter((ROOT, source, 0))
+
+    def _charge(self) -> float:
+        now = self.clock()
+        if self.current_line is not None: self.lines[self.current_line][1] += now - self.mark
+        self.mark = now
+        return now
+
+    def line(self, location: tuple[str, int]):
+        self._charge()
+        self.current_line = location
+        self.lines[location][0] += 1
+
+    def enter(self, key: tuple[str, str, int]):
+        now = self._charge()
+        path = self.calls[-1][4] + (key,) if self.calls else (key,)
+        self.calls.append([key, now, 0.0, self.current_line, path])
+        self.active[key] += 1
+        self.functions[key][0] += 1
+
+    def exit(self):
+        now = self._charge()
+        key, start, children, self.current_line, path = self.calls.pop()
+        elapsed = now - start
+        stats = self.functions[key]
+        stats[2] += elapsed - children
+        self.stacks[path] += elapsed - children
+        self.active[key] -= 1
+        if not self.active[key]: stats[1] += elapsed
+        if self.calls: self.calls[-1][2] += elapsed
+
+    def switch(self, key: tuple[str, str, int]):
+        self.exit()
+        self.enter(key)
+
+    def finish(self):
+        while self.calls: self.exit()
+
+    def report(self, stream: TextIO, limit: int = LINE_LIMIT):
+        total = sum(stats[2] for stats in self.functions.values()) or 1.0
+        print(f"{'chamadas':>10} {'inclusivo (s)':>14} {'exclusivo (s)':>14} {'%':>6}  função", file=stream)
+        for key, (calls, inclusive, exclusive) in sorted(self.functions.items(), key=lambda item: item[1][2], reverse=True):
+            print(f"{calls:>10} {inclusive:>14.6f} {exclusive:>14.6f} {exclusive / total:>6.1%}  {describe(key)}", file=stream)
+        lines = sorted(self.lines.items(), key=lambda item: item[1][1], reverse=True)
+        print(f"\n{'execuções':>10} {'tempo (s)':>14} {'%':>6}  linha", file=stream)
+        for (source, line), (hits, elapsed) in lines[:limit]:
+            print(f"{hits:>10} {elapsed:>14.6f} {elapsed / total:>6.1%}  {source}:{line}", file=stream)
+        if len(lines) > limit: print(f"... e mais {len(lines) - limit} linhas", file=stream)
+
+    def write_collapsed(self, stream: TextIO):
+        for path, elapsed in self.stacks.items():
+            microseconds = round(elapsed * 1e6)
+            if microseconds: stream.write(f"{';'.join(map(describe, path))} {microseconds}\n")
+
+class Profiling:
+    profiler: Profiler
+
+    def load_source(self, source: str | TextIO):
+        program, imports = Interpreter.load_source(self, source)
+        return locate(program, source_name(source)), imports
+
+    def create_module_interpreter(self):
+        interpreter = super().create_module_interpreter()
+        interpreter.profiler = self.profiler
+        return interpreter
+
+    def _call_function(self, call: TailCall):
+        self.profiler.enter(function_key(call.function.declaration))
+        try:
+            return super()._call_function(call)
+        finally:
+            self.profiler.exit()
+
+class ProfiledInterpreter(Profiling, Interpreter):
+    def visit(self, node):
+        if isinstance(node, Statement): self.profiler.line(node.location)
+        return super().visit(node)
+
+    def visit_ReturnStatement(self, node: ReturnStatement):
+        completion = super().visit_ReturnStatement(node)
+        if node.tail_call: self.profiler.switch(function_key(completion.function.declaration))
+        return completion
+
+class ProfilingCompiler(ClosureCompiler):
+    def compile(self, node):
+        compiled = super().compile(node)
+        if not isinstance(node, Statement): return compiled
+        line, location = self.interpreter.profiler.line, node.location
+        def profiled_statement(env):
+            line(location)
+            return compiled(env)
+        return profiled_statement
+
+    def _compile_call_preparation(self, node: FunctionCall):
+        prepare_call, switch = super()._compile_call_preparation(node), self.interpreter.profiler.switch
+        def profiled_call_preparation(env):
+            call = prepare_call(env)
+            switch(function_key(call.function.declaration))
+            return call
+        return profiled_call_preparation
+
+class ProfiledCompiledInterpreter(Profiling, CompiledInterpreter):
+    def __init__(self):
+        super().__init__()
+        self.compiler = ProfilingCompiler(self)
+
+class ProfiledVirtualMachine(Profiling, VirtualMachine):
+    def run(self, nodes, base_path='.'):
+        self.execute(BytecodeCompiler(self.environment, self.elide_scopes, profile=True).compile_program(nodes), base_path)
+
+    def run_program(self, program: list[Statement], base_path: str):
+        self.run(program, base_path)
+
+PROFILED_ENGINES = {"tree": ProfiledInterpreter, "compiled": ProfiledCompiledInterpreter, "vm": ProfiledVirtualMachine}
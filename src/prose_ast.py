@@ -1,7 +1,9 @@
 from dataclasses import dataclass, field
+from types import MemberDescriptorType
 from util.token import Token, TokenType
 from render import (Type, VariableBank, FunctionType, IntegerType, RationalType, 
-                    StringType, BooleanType, ListType, StructType, VoidType)
+                    StringType, ListType, MapType, StructType, Scope, Symbol, Address, NativeFunction, NativeTypeError,
+                    INTEGER, RATIONAL, STRING, BOOLEAN, VOID, PRIMITIVE_TYPES)
 
 class ProseException(Exception):
     def __init__(self, message, token):
@@ -16,12 +18,14 @@ def assert_type_compatible(expected_type: Type, actual_type: Type, token: Token,
     if not (expected_type == actual_type):
         raise ParseException(f"{message_prefix}Esperava o tipo '{expected_type}', mas obteve '{actual_type}'", token)
 
+def annotation(): return field(default=None, repr=False, compare=False)
+
 LITERAL_AND_IDENTIFIER_TOKENS = {TokenType.BOOLEAN, TokenType.RATIONAL, TokenType.INTEGER, TokenType.STRING, TokenType.IDENTIFIER}
+MAP_KEY_TYPES = ('integer', 'rational', 'string', 'boolean')
 NATIVE_METHOD_MAP = {('list', 'length'): 'size', ('list', 'add'): 'add', ('list', 'get'): 'get', ('list', 'remove'): 'remove', ('string', 'uppercase'): 'toUpperCase', ('string', 'lowercase'): 'toLowerCase', ('string', 'substring'): 'substring'}
 
-@dataclass
 class ModuleType(Type):
-    name: str
+    attributes = ('name',)
     def __repr__(self): return f"module<{self.name}>"
 
 @dataclass
@@ -33,8 +37,7 @@ class SimpleTypeNode(TypeNode):
     type_token: Token
     varbank: VariableBank 
     def to_type_object(self) -> Type:
-        type_map = {'integer': IntegerType(), 'rational': RationalType(), 'string': StringType(), 'boolean': BooleanType(), 'void': VoidType()}
-        if self.type_token.value in type_map: return type_map[self.type_token.value]
+        if self.type_token.value in PRIMITIVE_TYPES: return PRIMITIVE_TYPES[self.type_token.value]
         return self.varbank.get_struct_type(self.type_token.value)
     def __repr__(self): return self.type_token.value
 
@@ -44,6 +47,13 @@ class ListTypeNode(TypeNode):
     def to_type_object(self) -> Type: return ListType(self.element_type.to_type_object())
     def __repr__(self): return f"list<{self.element_type}>"
 
+@dataclass
+class MapTypeNode(TypeNode):
+    key_type: TypeNode
+    value_type: TypeNode
+    def to_type_object(self) -> Type: return MapType(self.key_type.to_type_object(), self.value_type.to_type_object())
+    def __repr__(self): return f"map<{self.key_type}, {self.value_type}>"
+
 @dataclass
 class FunctionTypeNode(TypeNode):
     param_types: list[TypeNode]
@@ -56,38 +66,57 @@ class FunctionTypeNode(TypeNode):
 
 @dataclass
 class Expression:
+    static_type = None
     def get_type(self, varbank: VariableBank) -> Type: raise NotImplementedError
 
 @dataclass
 class Value(Expression):
     token: Token
+    address: Address | None = annotation()
     def get_type(self, varbank: VariableBank) -> Type:
-        if self.token.token_type == TokenType.INTEGER: return IntegerType()
-        if self.token.token_type == TokenType.RATIONAL: return RationalType()
-        if self.token.token_type == TokenType.STRING: return StringType()
-        if self.token.token_type == TokenType.BOOLEAN: return BooleanType()
+        if self.token.token_type == TokenType.INTEGER: return INTEGER
+        if self.token.token_type == TokenType.RATIONAL: return RATIONAL
+        if self.token.token_type == TokenType.STRING: return STRING
+        if self.token.token_type == TokenType.BOOLEAN: return BOOLEAN
         if self.token.token_type == TokenType.IDENTIFIER: return varbank.get(self.token.value).vartype
         raise ParseException("Tipo de valor desconhecido", self.token)
 
+@dataclass
+class Constant(Value):
+    value: object = None; var_type: Type | None = None
+    def __post_init__(self): self.static_type = self.var_type
+    def get_type(self, varbank: VariableBank) -> Type: return self.var_type
+
+def literal_value(token: Token):
+    if token.token_type == TokenType.INTEGER: return int(token.value)
+    if token.token_type == TokenType.RATIONAL: return float(token.value)
+    if token.token_type == TokenType.STRING: return token.value[1:-1]
+    if token.token_type == TokenType.BOOLEAN: return token.value == 'true'
+
+def error_token(expression: Expression) -> Token:
+    return expression.token if isinstance(expression, Value) else Token(TokenType.NONE, '', 0, 0)
+
 @dataclass
 class BinOp(Expression):
     left: Expression; op: Token; right: Expression
+    operation: object = annotation()
     def get_type(self, varbank: VariableBank) -> Type:
         left_type, right_type = self.left.get_type(varbank), self.right.get_type(varbank)
         if self.op.token_type in {TokenType.ADDITION, TokenType.SUBTRACTION, TokenType.MULTIPLICATION, TokenType.DIVISION, TokenType.MODULUS}:
-            if isinstance(left_type, StringType) and self.op.token_type == TokenType.ADDITION: return StringType()
-            if isinstance(left_type, (IntegerType, RationalType)) and isinstance(right_type, (IntegerType, RationalType)): return RationalType() if isinstance(left_type, RationalType) or isinstance(right_type, RationalType) else IntegerType()
+            if isinstance(left_type, StringType) and self.op.token_type == TokenType.ADDITION: return STRING
+            if isinstance(left_type, (IntegerType, RationalType)) and isinstance(right_type, (IntegerType, RationalType)): return RATIONAL if isinstance(left_type, RationalType) or isinstance(right_type, RationalType) else INTEGER
             raise ParseException(f"Operador '{self.op.value}' inválido para os tipos {left_type} e {right_type}", self.op)
-        if self.op.token_type in {TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.GREATER, TokenType.LESS, TokenType.GREATER_EQUAL, TokenType.LESS_EQUAL, TokenType.AND, TokenType.OR}: return BooleanType()
+        if self.op.token_type in {TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.GREATER, TokenType.LESS, TokenType.GREATER_EQUAL, TokenType.LESS_EQUAL, TokenType.AND, TokenType.OR}: return BOOLEAN
         raise ParseException(f"Operador desconhecido ou inválido '{self.op.value}'", self.op)
 
 @dataclass
 class MemberAccess(Expression):
     obj: Expression
     member: Token
+    field: MemberDescriptorType | None = annotation()
     def get_type(self, varbank: VariableBank) -> Type:
         obj_type = self.obj.get_type(varbank)
-        if isinstance(obj_type, ListType) and self.member.value == 'length': return IntegerType()
+        if isinstance(obj_type, ListType) and self.member.value == 'length': return INTEGER
         if not isinstance(obj_type, StructType): raise ParseException(f"Tentativa de acessar membro em um tipo que não é uma struct ('{obj_type}')", self.member)
         if self.member.value not in obj_type.fields: raise ParseException(f"O tipo '{obj_type.name}' não possui um membro chamado '{self.member.value}'", self.member)
         return obj_type.fields[self.member.value]
@@ -96,30 +125,28 @@ class MemberAccess(Expression):
 class FunctionCall(Expression):
     callee: Expression
     arguments: list[Expression]
+    native: NativeFunction | None = annotation()
     def get_type(self, varbank: VariableBank) -> Type:
-        if isinstance(self.callee, Value):
-            func_name = self.callee.token.value
-            if func_name == 'readme': return StringType()
-            if varbank.is_native_function(func_name):
-                if func_name == 'get':
-                    if len(self.arguments) < 1: raise ParseException("'get' precisa de argumentos", self.callee.token)
-                    list_type = self.arguments[0].get_type(varbank)
-                    if not isinstance(list_type, ListType): raise ParseException(f"'get' só pode ser chamado em listas, não em '{list_type}'", self.callee.token)
-                    return list_type.element_type
-                if func_name == 'length': return IntegerType()
-                if func_name in ['uppercase', 'lowercase', 'substring']: return StringType()
-                return VoidType()
+        if self.native: return self.native_type([argument.get_type(varbank) for argument in self.arguments])
         callee_type = self.callee.get_type(varbank)
         if isinstance(callee_type, FunctionType): return callee_type.return_type
         raise ParseException(f"Expressão do tipo '{callee_type}' não é chamável.", self.callee.token if isinstance(self.callee, Value) else Token(TokenType.NONE,'',0,0))
+    def native_type(self, argument_types: list[Type | None]) -> Type | None:
+        try:
+            return self.native.return_type(argument_types)
+        except NativeTypeError as error:
+            raise ParseException(str(error), self.callee.token)
 
 @dataclass
-class Statement: pass
+class Statement:
+    line = 0
+    location = None
 
 @dataclass
 class ImportStatement(Statement):
     module_path: Token
     imported_names: list[Token] | None = field(default=None)
+    bindings: list[tuple[Symbol, bool]] | None = annotation()
 
 @dataclass
 class StructDefinition(Statement):
@@ -133,7 +160,13 @@ class ExpressionStatement(Statement):
 @dataclass
 class ListLiteral(Expression):
     elements: list[Expression]
-    def get_type(self, varbank: VariableBank) -> Type: return ListType(self.elements[0].get_type(varbank) if self.elements else VoidType())
+    def get_type(self, varbank: VariableBank) -> Type: return ListType(self.elements[0].get_type(varbank) if self.elements else VOID)
+
+@dataclass
+class MapLiteral(Expression):
+    keys: list[Expression]; values: list[Expression]
+    def get_type(self, varbank: VariableBank) -> Type:
+        return MapType(self.keys[0].get_type(varbank), self.values[0].get_type(varbank)) if self.keys else MapType(VOID, VOID)
 
 @dataclass
 class ListAccess(Expression):
@@ -141,6 +174,7 @@ class ListAccess(Expression):
     def get_type(self, varbank: VariableBank) -> Type:
         list_type = self.list_expr.get_type(varbank)
         if isinstance(list_type, ListType): return list_type.element_type
+        if isinstance(list_type, MapType): return list_type.value_type
         raise ParseException("Tentativa de acesso por índice em um não-lista", Token(TokenType.NONE, '[]', 0, 0))
 
 @dataclass
@@ -154,18 +188,22 @@ class MemberAssignmentStatement(Statement):
 @dataclass
 class CreateStatement(Statement):
     type_node: TypeNode; const_or_var: Token; identifier: Token; expression: Expression | None
+    symbol: Symbol | None = annotation(); redeclaration: bool = annotation()
 
 @dataclass
 class SetStatement(Statement):
     identifier: Token; expression: Expression
+    address: Address | None = annotation()
 
 @dataclass
 class ReadmeStatement(Statement):
     target_variable: Token; prompt_expression: Expression
+    address: Address | None = annotation()
 
 @dataclass
 class ReadStatement(Statement):
     identifier: Token
+    address: Address | None = annotation()
 
 @dataclass
 class BaseWriteStatement(Statement):
@@ -177,23 +215,30 @@ class WriteLnStatement(BaseWriteStatement): __init__ = lambda self, expression:
 @dataclass
 class IfStructure(Statement):
     conditions: list[Expression]; bodies: list[list[Statement]]; else_body: list[list[Statement]] | None
+    scopes: list[Scope] | None = annotation(); else_scope: Scope | None = annotation()
 
 @dataclass
 class WhileStructure(Statement):
     condition: Expression; body: list[Statement]
+    scope: Scope | None = annotation()
 
 @dataclass
 class DoWhileStructure(Statement):
     condition: Expression; body: list[Statement]
+    scope: Scope | None = annotation()
 
 @dataclass
 class ForStructure(Statement):
     loop_variable: Token; iterable_expression: Expression; body: list[Statement]
+    symbol: Symbol | None = annotation(); scope: Scope | None = annotation()
 
 @dataclass
 class FunctionDeclaration(Statement):
     name: Token; params: list[tuple[TypeNode, Token]]; return_type_node: TypeNode; body: list[Statement]
+    symbol: Symbol | None = annotation(); redeclaration: bool = annotation()
+    scope: Scope | None = annotation(); param_bindings: list[tuple[Symbol, bool]] | None = annotation()
 
 @dataclass
 class ReturnStatement(Statement):
     return_token: Token; expression: Expression | None
+    tail_call: bool = annotation()
@@ -1,18 +1,51 @@
-from enum import Enum, auto
-from dataclasses import dataclass, field
+from array import array
+from types import MemberDescriptorType
+from dataclasses import dataclass
+from typing import Callable
+
+TYPE_TABLE: dict[tuple, 'Type'] = {}
+
+def _freeze(value):
+    if isinstance(value, list): return tuple(value)
+    if isinstance(value, dict): return tuple(value.items())
+    return value
 
 class Type:
+    attributes: tuple[str, ...] = ()
+
+    def __new__(cls, *args):
+        key = (cls, *map(_freeze, args))
+        interned = TYPE_TABLE.get(key)
+        if interned is None:
+            candidate = super().__new__(cls)
+            candidate.__dict__.update(zip(cls.attributes, args), compatibility={})
+            interned = TYPE_TABLE.setdefault(key, candidate)
+        return interned
+
+    def __reduce__(self): return self.__class__, tuple(getattr(self, name) for name in self.attributes)
+
     def __eq__(self, other):
+        if self is other: return True
+        compatible = self.compatibility.get(other)
+        if compatible is None: compatible = self.compatibility[other] = self.accepts(other)
+        return compatible
+
+    __hash__ = object.__hash__
+
+    def accepts(self, other) -> bool:
         if isinstance(self, RationalType) and isinstance(other, IntegerType): return True
         if isinstance(self, ListType) and isinstance(other, ListType):
             if self.element_type is None or other.element_type is None: return True
             if isinstance(self.element_type, VoidType) or isinstance(other.element_type, VoidType): return True
             return self.element_type == other.element_type
+        if isinstance(self, MapType) and isinstance(other, MapType):
+            return all(mine is None or theirs is None or isinstance(mine, VoidType) or isinstance(theirs, VoidType) or mine == theirs
+                       for mine, theirs in ((self.key_type, other.key_type), (self.value_type, other.value_type)))
         if isinstance(self, StructType) and isinstance(other, StructType):
             return self.name == other.name
         if isinstance(self, FunctionType) and isinstance(other, FunctionType):
             return self.return_type == other.return_type and self.param_types == other.param_types
-        return isinstance(other, self.__class__)
+        return False
 
     def __repr__(self):
         return self.__class__.__name__.replace("Type", "").lower()
@@ -22,31 +55,223 @@ class RationalType(Type): pass
 class StringType(Type): pass
 class BooleanType(Type): pass
 class VoidType(Type): pass
+class BuilderType(Type): pass
+class RangeType(Type): pass
+
+INTEGER, RATIONAL, STRING, BOOLEAN, VOID, BUILDER, RANGE = IntegerType(), RationalType(), StringType(), BooleanType(), VoidType(), BuilderType(), RangeType()
+PRIMITIVE_TYPES = {'integer': INTEGER, 'rational': RATIONAL, 'string': STRING, 'boolean': BOOLEAN, 'void': VOID, 'builder': BUILDER}
 
-@dataclass
 class ListType(Type):
-    element_type: Type
-    def __repr__(self): return f"list<{self.element_type}>"
+    attributes = ('element_type',)
+    def __repr__(self): return "list" if self.element_type is None else f"list<{self.element_type}>"
+
+class MapType(Type):
+    attributes = ('key_type', 'value_type')
+    def __repr__(self): return "map" if self.key_type is None else f"map<{self.key_type}, {self.value_type}>"
 
-@dataclass
 class StructType(Type):
-    name: str
-    fields: dict[str, Type] = field(default_factory=dict)
+    attributes = ('name', 'fields')
+    def __new__(cls, name: str, fields: dict[str, Type] | None = None): return super().__new__(cls, name, fields or {})
     def __repr__(self): return self.name
 
-@dataclass
 class FunctionType(Type):
-    param_types: list[Type]
-    return_type: Type
+    attributes = ('param_types', 'return_type')
     def __repr__(self):
         params = ", ".join(map(str, self.param_types))
         return f"function({params}) -> {self.return_type}"
 
+COMPACT_TYPECODES = {INTEGER: 'q', RATIONAL: 'd'}
+
+class CompactList(array):
+    def __repr__(self): return repr(self.tolist())
+    def __eq__(self, other): return isinstance(other, (list, array)) and self.tolist() == list(other)
+    __hash__ = None
+
+class StructInstance:
+    __slots__ = ()
+    struct_type: StructType
+    fields: dict[str, MemberDescriptorType]
+    def __repr__(self):
+        fields = ', '.join(f'{name}={field.__get__(self)}' for name, field in self.fields.items())
+        return f"<StructInstance {fields}>"
+
+def struct_class(struct_type: StructType) -> type:
+    runtime_class = struct_type.__dict__.get('runtime_class')
+    if runtime_class is None:
+        slots = tuple(f'_{position}' for position in range(len(struct_type.fields)))
+        runtime_class = struct_type.runtime_class = type(struct_type.name, (StructInstance,), {'__slots__': slots, 'struct_type': struct_type})
+        runtime_class.fields = {name: runtime_class.__dict__[slot] for name, slot in zip(struct_type.fields, slots)}
+    return runtime_class
+
+def struct_field(struct_type: StructType, name: str) -> MemberDescriptorType: return struct_class(struct_type).fields[name]
+
+def struct_slot(struct_type: StructType, slot: str) -> MemberDescriptorType: return struct_class(struct_type).__dict__[slot]
+
 @dataclass
 class FunctionSignature:
     param_types: list[Type]
     return_type: Type
 
+class NativeTypeError(Exception): pass
+
+@dataclass
+class NativeFunction:
+    name: str
+    signature: FunctionSignature
+    implementation: Callable[[object, list], object]
+    return_rule: Callable[[list[Type | None]], Type | None] | None = None
+    requires_arguments: bool = True
+    optional: int = 0
+    def return_type(self, argument_types: list[Type | None]) -> Type | None:
+        self.check_arguments(argument_types)
+        return self.return_rule(argument_types) if self.return_rule else self.signature.return_type
+    def check_arguments(self, argument_types: list[Type | None]):
+        param_types = self.signature.param_types
+        minimum = len(param_types) - self.optional if self.requires_arguments else 0
+        if not minimum <= len(argument_types) <= len(param_types):
+            expected = str(len(param_types)) if minimum == len(param_types) else f"de {minimum} a {len(param_types)}"
+            raise NativeTypeError(f"Função nativa '{self.name}' espera {expected} argumento(s), mas recebeu {len(argument_types)}")
+        for position, (expected_type, actual_type) in enumerate(zip(param_types, argument_types), 1):
+            if expected_type is not None and actual_type is not None and not expected_type == actual_type:
+                raise NativeTypeError(f"Argumento {position} de '{self.name}' deveria ser '{expected_type}', mas é '{actual_type}'")
+    def __reduce__(self): return native_function, (self.name,)
+
+NATIVE_FUNCTIONS: dict[str, NativeFunction] = {}
+
+def native_function(name: str) -> NativeFunction: return NATIVE_FUNCTIONS[name]
+
+def register_native(name: str, param_types: list[Type | None], return_type: Type | None, implementation: Callable[[object, list], object], return_rule=None, requires_arguments=True, optional=0):
+    NATIVE_FUNCTIONS[name] = NativeFunction(name, FunctionSignature(param_types, return_type), implementation, return_rule, requires_arguments, optional)
+
+def list_element_type(argument_types: list[Type | None]) -> Type | None:
+    return argument_types[0].element_type if argument_types and isinstance(argument_types[0], ListType) else None
+
+def numeric_element_type(argument_types: list[Type | None]) -> Type | None:
+    element_type = list_element_type(argument_types)
+    if element_type is None or isinstance(element_type, VoidType): return None
+    if not RATIONAL == element_type: raise NativeTypeError(f"Esperava list<integer> ou list<rational>, mas obteve '{argument_types[0]}'")
+    return element_type
+
+def ordered_element_type(argument_types: list[Type | None]) -> Type | None:
+    element_type = list_element_type(argument_types)
+    if element_type is None or isinstance(element_type, VoidType): return None
+    if RATIONAL == element_type or isinstance(element_type, StringType): return element_type
+    raise NativeTypeError(f"Os elementos de '{argument_types[0]}' não podem ser ordenados")
+
+def sort_type(argument_types: list[Type | None]) -> Type:
+    ordered_element_type(argument_types)
+    return VOID
+
+def searched_element(return_type: Type) -> Callable[[list[Type | None]], Type]:
+    def rule(argument_types: list[Type | None]) -> Type:
+        check_compatible(list_element_type(argument_types), argument_types[1], f"Não é possível procurar um valor do tipo '{{actual}}' em '{argument_types[0]}'")
+        return return_type
+    return rule
+
+def same_list_type(argument_types: list[Type | None]) -> Type | None: return argument_types[0]
+
+def check_compatible(expected_type: Type | None, actual_type: Type | None, message: str):
+    if expected_type is None or actual_type is None or isinstance(expected_type, VoidType) or expected_type == actual_type: return
+    raise NativeTypeError(message.format(expected=expected_type, actual=actual_type))
+
+def item_type(argument_types: list[Type | None]) -> Type | None:
+    container_type, key_type = argument_types[0], argument_types[1]
+    if isinstance(container_type, ListType):
+        check_compatible(INTEGER, key_type, "Índice de lista deveria ser '{expected}', mas é '{actual}'")
+        return container_type.element_type
+    if isinstance(container_type, MapType):
+        check_compatible(container_type.key_type, key_type, "Chave do mapa deveria ser '{expected}', mas é '{actual}'")
+        return container_type.value_type
+    if container_type is None: return None
+    raise NativeTypeError(f"Esperava uma lista ou um mapa, mas obteve '{container_type}'")
+
+def removal_type(argument_types: list[Type | None]) -> Type:
+    item_type(argument_types)
+    return VOID
+
+def map_key_rule(return_type: Type | None) -> Callable[[list[Type | None]], Type | None]:
+    def rule(argument_types: list[Type | None]) -> Type | None:
+        map_type = argument_types[0]
+        if isinstance(map_type, MapType):
+            check_compatible(map_type.key_type, argument_types[1], "Chave do mapa deveria ser '{expected}', mas é '{actual}'")
+            if len(argument_types) > 2: check_compatible(map_type.value_type, argument_types[2], "Valor do mapa deveria ser '{expected}', mas é '{actual}'")
+        return return_type
+    return rule
+
+def map_keys_type(argument_types: list[Type | None]) -> Type:
+    map_type = argument_types[0]
+    return ListType(map_type.key_type if isinstance(map_type, MapType) and not isinstance(map_type.key_type, VoidType) else None)
+
+def put_entry(interpreter, arguments: list): arguments[0][arguments[1]] = arguments[2]
+
+def integer_range(interpreter, arguments: list) -> range:
+    if len(arguments) > 2 and arguments[2] == 0: raise Exception("o passo não pode ser zero")
+    return range(*arguments)
+
+def remove_at(interpreter, arguments: list): arguments[0].pop(arguments[1])
+
+class StringBuilder:
+    __slots__ = ('parts',)
+    def __init__(self): self.parts: list[str] = []
+    def append(self, value): self.parts.append(str(value))
+    def __str__(self):
+        if len(self.parts) > 1: self.parts[:] = [''.join(self.parts)]
+        return self.parts[0] if self.parts else ''
+    def __repr__(self): return f"StringBuilder({str(self)!r})"
+
+def builder_argument(arguments: list) -> StringBuilder:
+    if not isinstance(arguments[0], StringBuilder): raise Exception("o primeiro argumento deve ser um builder")
+    return arguments[0]
+
+def builder_append(interpreter, arguments: list): builder_argument(arguments).append(arguments[1])
+
+def list_extreme(choose: Callable) -> Callable[[object, list], object]:
+    def extreme(interpreter, arguments: list):
+        if not arguments[0]: raise Exception("a lista está vazia")
+        return choose(arguments[0])
+    return extreme
+
+def sort_list(interpreter, arguments: list):
+    values, descending = arguments[0], len(arguments) > 1 and arguments[1]
+    if isinstance(values, CompactList): values[:] = array(values.typecode, sorted(values, reverse=descending))
+    else: values.sort(reverse=descending)
+
+def index_of(interpreter, arguments: list) -> int:
+    try:
+        return arguments[0].index(arguments[1])
+    except ValueError:
+        return -1
+
+def slice_list(interpreter, arguments: list):
+    values = arguments[0]
+    part = values[arguments[1]:arguments[2]]
+    return CompactList(values.typecode, part) if isinstance(values, CompactList) else part
+
+register_native('length', [None], INTEGER, lambda interpreter, arguments: len(arguments[0]))
+register_native('add', [ListType(None), None], VOID, lambda interpreter, arguments: arguments[0].append(arguments[1]))
+register_native('get', [None, None], None, lambda interpreter, arguments: arguments[0][arguments[1]], item_type)
+register_native('remove', [None, None], VOID, remove_at, removal_type)
+register_native('sum', [ListType(None)], INTEGER, lambda interpreter, arguments: sum(arguments[0]), numeric_element_type)
+register_native('min', [ListType(None)], None, list_extreme(min), ordered_element_type)
+register_native('max', [ListType(None)], None, list_extreme(max), ordered_element_type)
+register_native('sort', [ListType(None), BOOLEAN], VOID, sort_list, sort_type, optional=1)
+register_native('reverse', [ListType(None)], VOID, lambda interpreter, arguments: arguments[0].reverse())
+register_native('contains', [ListType(None), None], BOOLEAN, lambda interpreter, arguments: arguments[1] in arguments[0], searched_element(BOOLEAN))
+register_native('index_of', [ListType(None), None], INTEGER, index_of, searched_element(INTEGER))
+register_native('slice', [ListType(None), INTEGER, INTEGER], None, slice_list, same_list_type)
+register_native('put', [MapType(None, None), None, None], VOID, put_entry, map_key_rule(VOID))
+register_native('has', [MapType(None, None), None], BOOLEAN, lambda interpreter, arguments: arguments[1] in arguments[0], map_key_rule(BOOLEAN))
+register_native('keys', [MapType(None, None)], None, lambda interpreter, arguments: list(arguments[0]), map_keys_type)
+register_native('range', [INTEGER, INTEGER, INTEGER], RANGE, integer_range, optional=2)
+register_native('uppercase', [STRING], STRING, lambda interpreter, arguments: arguments[0].upper())
+register_native('lowercase', [STRING], STRING, lambda interpreter, arguments: arguments[0].lower())
+register_native('substring', [STRING, INTEGER, INTEGER], STRING, lambda interpreter, arguments: arguments[0][arguments[1]:arguments[2]])
+register_native('append', [BUILDER, None], VOID, builder_append)
+register_native('to_string', [BUILDER], STRING, lambda interpreter, arguments: str(builder_argument(arguments)))
+register_native('readme', [STRING], STRING, lambda interpreter, arguments: None, requires_arguments=False)
+register_native('read_lines', [], ListType(STRING), lambda interpreter, arguments: interpreter.input.read_lines(), requires_arguments=False)
+register_native('end_of_input', [], BOOLEAN, lambda interpreter, arguments: interpreter.input.at_end(), requires_arguments=False)
+
 class Variable:
     def __init__(self, constant: bool, vartype: Type, value):
         self.constant = constant
@@ -57,20 +282,12 @@ class VariableBank:
     def __init__(self, parent=None):
         self.variables: dict[str, Variable] = {}
         self.parent = parent
+        self.globals = self if parent is None else parent.globals
         
         if parent is None:
             self.functions: dict[str, FunctionSignature] = {}
             self.structs: dict[str, StructType] = {}
-            self.native_functions: dict[str, FunctionSignature] = {
-                "length": FunctionSignature(param_types=[ListType(None)], return_type=IntegerType()),
-                "add": FunctionSignature(param_types=[ListType(None), None], return_type=VoidType()),
-                "get": FunctionSignature(param_types=[ListType(None), IntegerType()], return_type=None),
-                "remove": FunctionSignature(param_types=[ListType(None), IntegerType()], return_type=VoidType()),
-                "uppercase": FunctionSignature(param_types=[StringType()], return_type=StringType()),
-                "lowercase": FunctionSignature(param_types=[StringType()], return_type=StringType()),
-                "substring": FunctionSignature(param_types=[StringType(), IntegerType(), IntegerType()], return_type=StringType()),
-                "readme": FunctionSignature(param_types=[StringType()], return_type=StringType()),
-            }
+            self.native_functions = NATIVE_FUNCTIONS
 
     def create(self, name: str, constant: bool, vartype: Type, value):
         if name in self.variables: raise Exception(f"Redeclaração da variável '{name}' no mesmo escopo")
@@ -91,33 +308,134 @@ class VariableBank:
             return
         raise Exception(f"Nenhuma variável com o nome '{name}' foi declarada")
 
-    def get_global_scope(self):
-        scope = self
-        while scope.parent:
-            scope = scope.parent
-        return scope
-
     def create_function(self, name: str, signature: FunctionSignature):
-        globals = self.get_global_scope()
+        globals = self.globals
         if name in globals.functions or name in globals.native_functions: raise Exception(f"Redeclaração da função '{name}'")
         globals.functions[name] = signature
     
     def create_struct(self, name: str, fields: dict[str, Type]):
-        globals = self.get_global_scope()
+        globals = self.globals
         if name in globals.structs: raise Exception(f"Redeclaração do tipo '{name}'")
         globals.structs[name] = StructType(name, fields)
     
     def get_struct_type(self, name: str) -> StructType:
-        globals = self.get_global_scope()
+        globals = self.globals
         if name in globals.structs: return globals.structs[name]
         raise Exception(f"Tipo desconhecido '{name}'")
     
     def is_native_function(self, name: str) -> bool:
-        globals = self.get_global_scope()
-        return name in globals.native_functions
+        return name in self.globals.native_functions
 
     def get_function_signature(self, name: str) -> FunctionSignature:
-        globals = self.get_global_scope()
+        globals = self.globals
         if name in globals.functions: return globals.functions[name]
-        if name in globals.native_functions: return globals.native_functions[name]
-        raise Exception(f"Tentativa de chamar função não declarada '{name}'")
\ No newline at end of file
+        if name in globals.native_functions: return globals.native_functions[name].signature
+        raise Exception(f"Tentativa de chamar função não declarada '{name}'")
+class Unbound:
+    def __repr__(self): return '<unbound>'
+    def __reduce__(self): return 'UNBOUND'
+
+UNBOUND = Unbound()
+
+@dataclass
+class Symbol:
+    name: str
+    slot: int
+    var_type: Type | None
+    constant: bool
+    boxed: bool = False
+
+class Scope:
+    def __init__(self):
+        self.symbols: dict[str, Symbol] = {}
+        self.size = 0
+        self.blank: tuple = ()
+        self.elided = False
+        self.reusable = False
+
+    def seal(self, elide: bool, captured: bool):
+        self.blank = (UNBOUND,) * self.size
+        self.elided = elide and not self.size
+        self.reusable = elide and not captured and self.size > 0
+
+    def declare(self, name: str, var_type: Type | None, constant: bool, boxed=False) -> tuple[Symbol, bool]:
+        if name in self.symbols: return self.symbols[name], True
+        symbol = self.symbols[name] = Symbol(name, self.size, var_type, constant, boxed)
+        self.size += 1
+        return symbol, False
+
+@dataclass
+class Address:
+    depth: int
+    symbol: Symbol
+    bound: bool = True
+
+class Frame:
+    __slots__ = ('slots', 'parent', 'globals', 'scope')
+    def __init__(self, scope: Scope, enclosing):
+        self.slots = list(scope.blank)
+        self.parent = enclosing if type(enclosing) is Frame else None
+        self.globals = enclosing.globals
+        self.scope = scope
+
+    def get(self, name: str) -> Variable:
+        frame = self
+        while frame is not None:
+            symbol = frame.scope.symbols.get(name)
+            if symbol is not None:
+                stored = frame.slots[symbol.slot]
+                if stored is not UNBOUND: return stored if symbol.boxed else Variable(symbol.constant, symbol.var_type, stored)
+            frame = frame.parent
+        return self.globals.get(name)
+
+    def _enclosing(self, frame, name: str) -> Variable:
+        return frame.parent.get(name) if frame.parent is not None else self.globals.get(name)
+
+    def reset(self):
+        self.slots[:] = self.scope.blank
+
+    def declare(self, symbol: Symbol, redeclaration: bool, value):
+        if redeclaration: raise Exception(f"Redeclaração da variável '{symbol.name}' no mesmo escopo")
+        self.slots[symbol.slot] = value
+
+    def load(self, address: Address):
+        frame = self
+        for _ in range(address.depth): frame = frame.parent
+        symbol = address.symbol
+        stored = frame.slots[symbol.slot]
+        if stored is UNBOUND: return self._enclosing(frame, symbol.name).value
+        return stored.value if symbol.boxed else stored
+
+    def load_type(self, address: Address) -> Type | None:
+        frame = self
+        for _ in range(address.depth): frame = frame.parent
+        symbol = address.symbol
+        stored = frame.slots[symbol.slot]
+        if stored is UNBOUND: return self._enclosing(frame, symbol.name).vartype
+        return stored.vartype if symbol.boxed else symbol.var_type
+
+    def store(self, address: Address, value, force=False):
+        frame = self
+        for _ in range(address.depth): frame = frame.parent
+        symbol = address.symbol
+        stored = frame.slots[symbol.slot]
+        if stored is UNBOUND:
+            if frame.parent is not None: frame.parent.assign(symbol.name, value, force)
+            elif force: self.globals.get(symbol.name).value = value
+            else: self.globals.set(symbol.name, value)
+        elif symbol.boxed:
+            if stored.constant and not force: raise Exception(f"Não é possível alterar o valor da constante '{symbol.name}'")
+            stored.value = value
+        elif symbol.constant and not force: raise Exception(f"Não é possível alterar o valor da constante '{symbol.name}'")
+        else: frame.slots[symbol.slot] = value
+
+    def assign(self, name: str, value, force=False):
+        frame = self
+        while frame is not None:
+            symbol = frame.scope.symbols.get(name)
+            if symbol is not None and frame.slots[symbol.slot] is not UNBOUND:
+                frame.store(Address(0, symbol), value, force)
+                return
+            frame = frame.parent
+        if force: self.globals.get(name).value = value
+        else: self.globals.set(name, value)
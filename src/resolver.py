@@ -0,0 +1,213 @@
+from prose_ast import *
+from render import Scope, Address, FunctionType, RangeType, NativeFunction, NATIVE_FUNCTIONS, struct_field
+
+ARITHMETIC_TOKENS = {TokenType.ADDITION, TokenType.SUBTRACTION, TokenType.MULTIPLICATION, TokenType.DIVISION, TokenType.MODULUS}
+
+def binop_type(op: TokenType, left_type: Type | None, right_type: Type | None) -> Type | None:
+    if op not in ARITHMETIC_TOKENS: return BOOLEAN
+    if op == TokenType.ADDITION and (isinstance(left_type, StringType) or isinstance(right_type, StringType)): return STRING
+    if left_type is None or right_type is None: return None
+    return RATIONAL if isinstance(left_type, RationalType) or isinstance(right_type, RationalType) else INTEGER
+
+class ResolverScope:
+    def __init__(self, parent, function=False):
+        self.parent = parent
+        self.function = function
+        self.scope = Scope()
+        self.captured = False
+
+class Resolver:
+    def __init__(self, elide_scopes=True, varbank: VariableBank | None = None):
+        self.elide_scopes = elide_scopes
+        self.varbank = varbank
+        self.global_types: dict[str, Type | None] = {}
+        self.current: ResolverScope | None = None
+        self.deferred: list[FunctionDeclaration] = []
+        self.addresses: list[tuple[Address, list[Scope]]] = []
+        self.loop_iterable: Expression | None = None
+
+    def resolve(self, nodes: list[Statement]) -> list[Statement]:
+        for node in nodes:
+            if isinstance(node, FunctionDeclaration): self.global_types[node.name.value] = self._function_type(node)
+        self._resolve_statements(nodes)
+        for address, crossed in self.addresses: address.depth = sum(not scope.elided for scope in crossed)
+        self.addresses = []
+        return nodes
+
+    def _resolve_statements(self, statements: list[Statement]):
+        previous, self.deferred = self.deferred, []
+        for statement in statements: self.resolve_node(statement)
+        deferred, self.deferred = self.deferred, previous
+        for declaration in deferred: self._resolve_function(declaration)
+
+    def _resolve_block(self, statements: list[Statement], declare=None, function=False) -> Scope:
+        self.current = ResolverScope(self.current, function)
+        try:
+            if declare: declare()
+            self._resolve_statements(statements)
+            self.current.scope.seal(self.elide_scopes, self.current.captured)
+            return self.current.scope
+        finally:
+            self.current = self.current.parent
+
+    def _resolve_function(self, node: FunctionDeclaration):
+        def declare_params():
+            node.param_bindings = [self.current.scope.declare(name_token.value, self._static_type(type_node), False) for type_node, name_token in node.params]
+        node.scope = self._resolve_block(node.body, declare_params, function=True)
+
+    def _static_type(self, type_node: TypeNode):
+        try: return type_node.to_type_object()
+        except Exception: return None
+
+    def _function_type(self, node: FunctionDeclaration) -> FunctionType | None:
+        try: return FunctionType([p[0].to_type_object() for p in node.params], node.return_type_node.to_type_object())
+        except Exception: return None
+
+    def _declare(self, name: str, var_type, constant: bool, boxed=False):
+        if self.current is None:
+            self.global_types[name] = var_type
+            return None, False
+        return self.current.scope.declare(name, var_type, constant, boxed)
+
+    def _global_type(self, name: str) -> Type | None:
+        if name in self.global_types: return self.global_types[name]
+        try: return self.varbank.get(name).vartype if self.varbank else None
+        except Exception: return None
+
+    def _user_symbol(self, name: str) -> bool:
+        if name in self.global_types: return True
+        try: return self.varbank is not None and self.varbank.get(name) is not None
+        except Exception: return False
+
+    def _native(self, callee: Expression) -> NativeFunction | None:
+        if not isinstance(callee, Value) or callee.token.token_type != TokenType.IDENTIFIER or callee.address is not None: return None
+        if self._user_symbol(callee.token.value): return None
+        return NATIVE_FUNCTIONS.get(callee.token.value)
+
+    def _lookup(self, name: str) -> Address | None:
+        scope, crossed, bound = self.current, [], True
+        while scope is not None:
+            symbol = scope.scope.symbols.get(name)
+            if symbol is not None:
+                address = Address(len(crossed), symbol, bound)
+                self.addresses.append((address, crossed))
+                return address
+            crossed.append(scope.scope)
+            bound = bound and not scope.function
+            scope = scope.parent
+        return None
+
+    def resolve_node(self, node):
+        method = getattr(self, f'resolve_{type(node).__name__}', None)
+        if method: method(node)
+
+    def resolve_Value(self, node: Value):
+        if node.token.token_type != TokenType.IDENTIFIER:
+            node.static_type = node.get_type(self.varbank)
+            return
+        node.address = self._lookup(node.token.value)
+        node.static_type = self._global_type(node.token.value) if node.address is None else node.address.symbol.var_type
+
+    def resolve_BinOp(self, node: BinOp):
+        self.resolve_node(node.left); self.resolve_node(node.right)
+        node.static_type = binop_type(node.op.token_type, node.left.static_type, node.right.static_type)
+
+    def resolve_FunctionCall(self, node: FunctionCall):
+        self.resolve_node(node.callee)
+        for argument in node.arguments: self.resolve_node(argument)
+        node.native = self._native(node.callee)
+        if node.native is NATIVE_FUNCTIONS['range'] and node is not self.loop_iterable:
+            raise ParseException("A função 'range' só pode ser usada como o intervalo de um laço 'for'", node.callee.token)
+        if node.native: node.static_type = node.native_type([argument.static_type for argument in node.arguments])
+        elif isinstance(node.callee.static_type, FunctionType): node.static_type = node.callee.static_type.return_type
+
+    def resolve_MemberAccess(self, node: MemberAccess):
+        self.resolve_node(node.obj)
+        obj_type = node.obj.static_type
+        if isinstance(obj_type, StructType):
+            node.static_type = obj_type.fields.get(node.member.value)
+            node.field = struct_field(obj_type, node.member.value) if node.member.value in obj_type.fields else None
+        elif isinstance(obj_type, ListType) and node.member.value == 'length': node.static_type = INTEGER
+
+    def resolve_ListAccess(self, node: ListAccess):
+        self.resolve_node(node.list_expr); self.resolve_node(node.index_expression)
+        if isinstance(node.list_expr.static_type, ListType): node.static_type = node.list_expr.static_type.element_type
+        elif isinstance(node.list_expr.static_type, MapType): node.static_type = node.list_expr.static_type.value_type
+
+    def resolve_ListLiteral(self, node: ListLiteral):
+        for element in node.elements: self.resolve_node(element)
+        node.static_type = ListType(node.elements[0].static_type if node.elements else VOID)
+
+    def resolve_MapLiteral(self, node: MapLiteral):
+        for key, value in zip(node.keys, node.values): self.resolve_node(key); self.resolve_node(value)
+        node.static_type = MapType(node.keys[0].static_type, node.values[0].static_type) if node.keys else MapType(VOID, VOID)
+
+    def resolve_ImportStatement(self, node: ImportStatement):
+        if node.imported_names: names = [(token.value, None) for token in node.imported_names]
+        else: names = [(node.module_path.value, ModuleType(node.module_path.value))]
+        bindings = [self._declare(name, var_type, True, boxed=True) for name, var_type in names]
+        if self.current is not None: node.bindings = bindings
+
+    def resolve_FunctionDeclaration(self, node: FunctionDeclaration):
+        node.symbol, node.redeclaration = self._declare(node.name.value, self._function_type(node), True)
+        scope = self.current
+        while scope is not None: scope.captured, scope = True, scope.parent
+        self.deferred.append(node)
+
+    def resolve_CreateStatement(self, node: CreateStatement):
+        if node.expression: self.resolve_node(node.expression)
+        node.symbol, node.redeclaration = self._declare(node.identifier.value, self._static_type(node.type_node), node.const_or_var.value == 'constant')
+
+    def resolve_SetStatement(self, node: SetStatement):
+        self.resolve_node(node.expression)
+        node.address = self._lookup(node.identifier.value)
+
+    def resolve_MemberAssignmentStatement(self, node: MemberAssignmentStatement):
+        self.resolve_node(node.member_access); self.resolve_node(node.expression)
+
+    def resolve_ListAssignmentStatement(self, node: ListAssignmentStatement):
+        self.resolve_node(node.list_access); self.resolve_node(node.expression)
+
+    def resolve_ExpressionStatement(self, node: ExpressionStatement):
+        self.resolve_node(node.expression)
+
+    def resolve_ReadStatement(self, node: ReadStatement):
+        node.address = self._lookup(node.identifier.value)
+
+    def resolve_ReadmeStatement(self, node: ReadmeStatement):
+        self.resolve_node(node.prompt_expression)
+        node.address = self._lookup(node.target_variable.value)
+
+    def resolve_WriteStatement(self, node: BaseWriteStatement):
+        self.resolve_node(node.expression)
+    resolve_WriteLnStatement = resolve_WriteStatement
+
+    def resolve_ReturnStatement(self, node: ReturnStatement):
+        if node.expression: self.resolve_node(node.expression)
+        scope = self.current
+        while scope is not None and not scope.function: scope = scope.parent
+        node.tail_call = scope is not None and isinstance(node.expression, FunctionCall) and node.expression.native is None
+
+    def resolve_IfStructure(self, node: IfStructure):
+        node.scopes = []
+        for condition, body in zip(node.conditions, node.bodies):
+            self.resolve_node(condition)
+            node.scopes.append(self._resolve_block(body))
+        if node.else_body: node.else_scope = self._resolve_block(node.else_body)
+
+    def resolve_WhileStructure(self, node: WhileStructure):
+        self.resolve_node(node.condition)
+        node.scope = self._resolve_block(node.body)
+
+    def resolve_DoWhileStructure(self, node: DoWhileStructure):
+        node.scope = self._resolve_block(node.body)
+        self.resolve_node(node.condition)
+
+    def resolve_ForStructure(self, node: ForStructure):
+        previous, self.loop_iterable = self.loop_iterable, node.iterable_expression
+        try: self.resolve_node(node.iterable_expression)
+        finally: self.loop_iterable = previous
+        iterable_type = node.iterable_expression.static_type
+        element_type = iterable_type.element_type if isinstance(iterable_type, ListType) else iterable_type.key_type if isinstance(iterable_type, MapType) else INTEGER if isinstance(iterable_type, RangeType) else STRING if isinstance(iterable_type, StringType) else None
+        def declare_loop_variable(): node.symbol = self.current.scope.declare(node.loop_variable.value, element_type, True, boxed=True)[0]
+        node.scope = self._resolve_block(node.body, declare_loop_variable)
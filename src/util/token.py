@@ -1,4 +1,5 @@
 from enum import Enum, auto
+from collections import deque
 
 class TokenType(Enum):
     NONE = auto()
@@ -30,6 +31,8 @@ class TokenType(Enum):
     COLON = auto()
     LBRACKET = auto()
     RBRACKET = auto()
+    LBRACE = auto()
+    RBRACE = auto()
     ARROW = auto()
     TYPE = auto()
     TYPE_KEYWORD = auto()
@@ -58,9 +61,24 @@ class TokenType(Enum):
     IN = auto()
 
 class Token:
+    __slots__ = ('token_type', 'value', 'line', 'column')
     def __init__(self, token_type, value, line, column):
         self.token_type = token_type
         self.value = value
         self.line = line
         self.column = column
-    def __repr__(self): return f"T({self.token_type.name}, {repr(self.value)})"
\ No newline at end of file
+    def __repr__(self): return f"T({self.token_type.name}, {repr(self.value)})"
+class TokenStream:
+    def __init__(self, tokens):
+        self._source = iter(tokens)
+        self._lookahead = deque()
+        self.current = next(self._source)
+    def peek(self, offset=1) -> Token:
+        lookahead = self._lookahead
+        while len(lookahead) < offset:
+            token = next(self._source, None)
+            if token is None: return lookahead[-1] if lookahead else self.current
+            lookahead.append(token)
+        return lookahead[offset - 1]
+    def advance(self):
+        self.current = self._lookahead.popleft() if self._lookahead else next(self._source, self.current)
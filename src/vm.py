@@ -0,0 +1,218 @@
+from typing import TextIO
+from prose_ast import *
+from render import VariableBank, Variable, Frame, FunctionType, CompactList
+from interpreter import Interpreter, ProseFunction, ValueWrapper, ReturnSignal, type_of, invalid_operation, loop_items, missing_member, member_field, compact_list_error
+from bytecode import *
+from optimizer import Optimizer
+
+class VMFunction(ProseFunction):
+    def __init__(self, function_code: FunctionCode, closure: VariableBank | Frame):
+        super().__init__(None, closure)
+        self.function_code = function_code
+    def __repr__(self): return f"<ProseFunction {self.function_code.name}>"
+    def function_type(self) -> FunctionType: return self.function_code.function_type
+
+class VirtualMachine(Interpreter):
+    def run(self, nodes, base_path='.'):
+        self.execute(BytecodeCompiler(self.environment, self.elide_scopes).compile_program(nodes), base_path)
+
+    def load_source(self, source: str | TextIO) -> tuple[CodeObject, list[str]]:
+        optimizer = Optimizer(self) if self.optimize else None
+        if isinstance(source, str) or not (self.elide_scopes and self.optimize): code = compile_source(source, self.environment, elide_scopes=self.elide_scopes, optimizer=optimizer)
+        else: code = load_program(source, self.environment, optimizer)
+        self.eliminated_nodes += code.eliminated_nodes
+        return code, code.imports
+
+    def run_program(self, program: CodeObject, base_path: str):
+        self.execute(program, base_path)
+
+    def execute(self, code_object: CodeObject, base_path='.'):
+        previous_path = getattr(self, 'base_path', '.')
+        self.base_path = base_path
+        try:
+            self._dispatch(code_object, self.environment)
+        finally:
+            self.base_path = previous_path
+
+    def _dispatch(self, code_object: CodeObject, env: VariableBank | Frame):
+        code, constants = code_object.code, code_object.constants
+        pc, stack, frames = 0, [], []
+        push, pop = stack.append, stack.pop
+        while True:
+            op, arg = code[pc], code[pc + 1]
+            pc += 2
+            if op == LOAD_LOCAL:
+                push(env.slots[arg])
+            elif op == LOAD_CONST:
+                push(constants[arg])
+            elif op == STORE_LOCAL:
+                env.slots[arg] = pop()
+            elif op == LOAD_GLOBAL:
+                push(env.globals.get(constants[arg]).value)
+            elif op == STORE_GLOBAL:
+                env.globals.set(constants[arg], pop())
+            elif op == LOAD_DEREF:
+                push(env.load(constants[arg]))
+            elif op == STORE_DEREF:
+                env.store(constants[arg], pop())
+            elif op == BINARY_OP:
+                right = pop()
+                try:
+                    stack[-1] = constants[arg][1](stack[-1], right)
+                except ZeroDivisionError:
+                    raise RuntimeException("Divisão por zero.", constants[arg][0])
+                except TypeError:
+                    op_token, _, left_type, right_type = constants[arg]
+                    raise invalid_operation(op_token, stack[-1], right, left_type, right_type)
+            elif op == BINARY_CONCAT:
+                right = pop()
+                stack[-1] = str(stack[-1]) + str(right)
+            elif op == JUMP_IF_FALSE:
+                if not pop(): pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == LOAD_FIELD:
+                field, member = constants[arg]
+                if stack[-1] is None: raise missing_member(member)
+                stack[-1] = field.__get__(stack[-1])
+            elif op == FOR_BIND:
+                loop_state = stack[-1]
+                for item in loop_state[0]:
+                    env = loop_state[2]
+                    env.reset()
+                    loop_state[3].value = item
+                    env.slots[loop_state[4]] = loop_state[3]
+                    break
+                else:
+                    pop()
+                    pc = arg
+            elif op == PUSH_SCOPE:
+                env = Frame(constants[arg], env)
+            elif op == POP_SCOPE:
+                env = env.parent or env.globals
+            elif op == NEW_FRAME:
+                push(Frame(constants[arg], env))
+            elif op == ENTER_FRAME:
+                env = stack[-1]
+                env.reset()
+            elif op == POP_TOP:
+                pop()
+            elif op == CHECK_CALLABLE:
+                if not isinstance(stack[-1], VMFunction):
+                    callee_token, callee_type = constants[arg]
+                    raise RuntimeException(f"Expressão do tipo '{type_of(stack[-1], callee_type)}' não é chamável.", callee_token)
+            elif op == CALL or op == TAIL_CALL:
+                argc, callee_token = constants[arg]
+                arg_values = stack[len(stack) - argc:]
+                del stack[len(stack) - argc:]
+                function = pop()
+                function_code = function.function_code
+                func_env = function.closure if function_code.scope.elided else Frame(function_code.scope, function.closure)
+                for i, (symbol, redeclaration) in enumerate(function_code.parameters):
+                    func_env.declare(symbol, redeclaration, arg_values[i])
+                if op == TAIL_CALL and frames: del stack[frames[-1][4]:]
+                elif len(frames) >= self.max_call_depth: raise self._stack_overflow(callee_token)
+                else: frames.append((code, constants, pc, env, len(stack)))
+                code, constants, pc, env = function_code.code.code, function_code.code.constants, 0, func_env
+            elif op == RETURN_VALUE or op == RETURN_NONE:
+                value = pop() if op == RETURN_VALUE else None
+                if not frames: raise ReturnSignal(ValueWrapper(value, type_of(value, constants[arg])) if op == RETURN_VALUE else ValueWrapper(None, VOID))
+                code, constants, pc, env, height = frames.pop()
+                del stack[height:]
+                push(value)
+            elif op == CALL_NATIVE:
+                native, name_token, argc = constants[arg]
+                arg_values = stack[len(stack) - argc:]
+                del stack[len(stack) - argc:]
+                push(self._call_native(native, name_token, arg_values))
+            elif op == GET_ITER:
+                iterable = pop()
+                token, static_type, *binding = constants[arg]
+                element_type = INTEGER if type(iterable) is range else self._element_type(iterable, static_type, token)
+                if binding: push([iter(loop_items(iterable)), element_type, Frame(binding[0], env), Variable(True, element_type, None), binding[1]])
+                else: push([iter(loop_items(iterable)), element_type, None, None])
+            elif op == FOR_ITER:
+                for item in stack[-1][0]:
+                    push(item)
+                    break
+                else:
+                    pop()
+                    pc = arg
+            elif op == BIND_LOOP:
+                scope, slot = constants[arg]
+                item = pop()
+                env = Frame(scope, env)
+                env.slots[slot] = Variable(True, stack[-1][1], item)
+            elif op == JUMP_IF_TRUE:
+                if pop(): pc = arg
+            elif op == CREATE:
+                name, constant, var_type = constants[arg]
+                env.create(name, constant, var_type, pop())
+            elif op == DECLARE:
+                symbol, redeclaration = constants[arg]
+                env.declare(symbol, redeclaration, pop())
+            elif op == LOAD_DEFAULT:
+                push(self._initial_value(constants[arg]))
+            elif op == BUILD_LIST:
+                elements = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                push(elements)
+            elif op == BUILD_MAP:
+                entries = stack[len(stack) - 2 * arg:]
+                del stack[len(stack) - 2 * arg:]
+                push(dict(zip(entries[::2], entries[1::2])))
+            elif op == LOAD_INDEX:
+                index = pop()
+                try:
+                    stack[-1] = stack[-1][index]
+                except IndexError:
+                    raise RuntimeException(f"Índice {index} fora dos limites da lista.", constants[arg])
+                except KeyError:
+                    raise RuntimeException(f"Chave {index!r} não encontrada no mapa.", constants[arg])
+            elif op == STORE_INDEX:
+                value, index, values = pop(), pop(), pop()
+                try:
+                    values[index] = value
+                except (OverflowError, TypeError):
+                    if isinstance(values, CompactList): raise compact_list_error(values, constants[arg])
+                    raise
+            elif op == LOAD_MEMBER:
+                member, static_type = constants[arg]
+                push(self._access_member(pop(), static_type, member))
+            elif op == STORE_MEMBER:
+                field, member = constants[arg]
+                value, obj = pop(), pop()
+                if field is None: field = member_field(obj, member)
+                elif obj is None: raise missing_member(member)
+                field.__set__(obj, value)
+            elif op == WRITE:
+                end, static_type = constants[arg]
+                self._write(pop(), static_type, end)
+            elif op == READ:
+                token, address = constants[arg]
+                var_type = self._input_type(env, address, token)
+                self._store_input(env, address, var_type, self._read_line(token), token)
+            elif op == READ_PROMPT:
+                token, address = constants[arg]
+                user_input = self._read_line(token, pop())
+                self._store_input(env, address, self._input_type(env, address, token), user_input, token)
+            elif op == MAKE_FUNCTION:
+                push(VMFunction(constants[arg], env))
+            elif op == DEFINE_STRUCT:
+                struct_type = constants[arg]
+                global_scope = env.globals
+                if struct_type.name not in global_scope.structs: global_scope.structs[struct_type.name] = struct_type
+            elif op == IMPORT:
+                self._import(constants[arg], env)
+            elif op == RAISE:
+                raise Exception(constants[arg])
+            elif op == HALT:
+                return
+            elif op == PROFILE_LINE:
+                self.profiler.line(constants[arg])
+            elif op == PROFILE_ENTER:
+                self.profiler.enter(constants[arg])
+            elif op == PROFILE_EXIT:
+                self.profiler.exit()
+            else:
+                raise Exception(f"Instrução desconhecida: {op}")
@@ -0,0 +1,47 @@
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from output import OutputSink
+from input_source import InputSource
+from main import ENGINES, run
+
+PROGRAMS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'programs')
+
+def execute(interpreter_class, path: str) -> str:
+    captured, input_path, flags_path = io.StringIO(), os.path.splitext(path)[0] + '.in', os.path.splitext(path)[0] + '.flags'
+    interpreter = interpreter_class()
+    interpreter.output = OutputSink(captured)
+    if os.path.exists(flags_path):
+        with open(flags_path, 'r', encoding='utf-8') as file: interpreter.compact_lists = '--compact-lists' in file.read().split()
+    if os.path.exists(input_path):
+        with open(input_path, 'r', encoding='utf-8') as file: interpreter.input = InputSource(io.StringIO(file.read()))
+    else: interpreter.input = InputSource(io.StringIO(''))
+    with open(path, 'r', encoding='utf-8') as file, redirect_stdout(captured):
+        run(file, interpreter, os.path.dirname(path))
+    return captured.getvalue()
+
+def main():
+    names = sys.argv[1:] or sorted(os.path.splitext(name)[0] for name in os.listdir(PROGRAMS_DIRECTORY) if name.endswith('.out'))
+    failures = 0
+    for name in names:
+        path = os.path.join(PROGRAMS_DIRECTORY, name + '.prose')
+        with open(os.path.join(PROGRAMS_DIRECTORY, name + '.out'), 'r', encoding='utf-8') as file: expected = file.read()
+        for engine, interpreter_class in ENGINES.items():
+            recursion_limit = sys.getrecursionlimit()
+            output = execute(interpreter_class, path)
+            passed = output == expected and sys.getrecursionlimit() == recursion_limit
+            failures += not passed
+            print(f"{'ok' if passed else 'FALHOU':<7} {engine:<9} {name}")
+            if output != expected: print(f"  esperado: {expected!r}\n  obtido:   {output!r}")
+            if sys.getrecursionlimit() != recursion_limit:
+                print(f"  limite de recursão alterado de {recursion_limit} para {sys.getrecursionlimit()}")
+                sys.setrecursionlimit(recursion_limit)
+    print(f"\n{failures} falha(s)" if failures else "\nTodos os programas passaram")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()